@@ -0,0 +1,124 @@
+"""
+Relatório do tempo de importação da aplicação.
+
+Importa o módulo em um processo novo com `python -X importtime` e
+interpreta a saída: o tempo total, os módulos mais caros e o tempo
+gasto nos módulos do próprio projeto. Com `--budget-ms`, termina com
+erro se o tempo total passar do orçamento; o mesmo orçamento é
+verificado pela suíte de testes.
+
+Uso:
+    python -m benchmarks.import_time --top 15 --budget-ms 1500
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Orçamentos, em milissegundos, verificados pelos testes
+IMPORT_TIME_BUDGET_MS = 1500
+PROJECT_IMPORT_TIME_BUDGET_MS = 100
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+@dataclass
+class ImportEntry:
+    """
+    Tempo de importação de um módulo.
+
+    Attributes:
+        module (str): O nome do módulo.
+        self_ms (float): Tempo gasto no próprio módulo.
+        cumulative_ms (float): Tempo do módulo e das suas importações.
+        depth (int): Nível de aninhamento da importação.
+    """
+
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def measure_imports(module: str) -> list[ImportEntry]:
+    """
+    Importa o módulo em um processo novo e lê os tempos de importação.
+
+    Args:
+        module (str): O módulo a ser importado.
+
+    Returns:
+        list[ImportEntry]: Os módulos importados, na ordem da saída do
+        `-X importtime` (as dependências antes de quem as importa).
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ.copy(),
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(
+                ImportEntry(
+                    module=name,
+                    self_ms=int(self_us) / 1000,
+                    cumulative_ms=int(cumulative_us) / 1000,
+                    depth=len(indent) // 2,
+                )
+            )
+    return entries
+
+
+def total_ms(entries: list[ImportEntry], module: str) -> float:
+    """Tempo total da importação do módulo, com as dependências."""
+    return next(e.cumulative_ms for e in entries if e.module == module)
+
+
+def project_ms(entries: list[ImportEntry], package: str) -> float:
+    """Tempo gasto nos módulos do pacote, sem as dependências."""
+    return sum(
+        e.self_ms
+        for e in entries
+        if e.module == package or e.module.startswith(f'{package}.')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--module', default='fastapi_do_zero.app')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument(
+        '--budget-ms', type=float, default=IMPORT_TIME_BUDGET_MS
+    )
+    args = parser.parse_args()
+
+    entries = measure_imports(args.module)
+    package = args.module.split('.')[0]
+    total = total_ms(entries, args.module)
+
+    print(f'{args.module}: {total:.1f} ms (orçamento {args.budget_ms} ms)')
+    print(f'módulos de {package}: {project_ms(entries, package):.1f} ms')
+    print(f'{args.top} módulos mais caros (tempo próprio):')
+    for entry in sorted(entries, key=lambda e: e.self_ms, reverse=True)[
+        : args.top
+    ]:
+        print(
+            f'  {entry.module:<48} {entry.self_ms:8.1f} ms'
+            f'  (total {entry.cumulative_ms:8.1f} ms)'
+        )
+
+    if total > args.budget_ms:
+        print('Orçamento de importação excedido')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+"""
+Benchmark de carga dos endpoints da aplicação, executado em processo.
+
+Cada cenário dispara requisições contra o `app` por um cliente HTTP
+assíncrono (httpx com ASGITransport), com a concorrência configurada,
+e mede a vazão e as latências p50, p95 e p99. Os resultados são
+gravados em JSON e podem ser comparados com um resultado anterior
+(baseline): o comando termina com erro se algum cenário ficar mais
+lento que a tolerância permite.
+
+A aplicação é criada com `create_app` e executada dentro do seu ciclo
+de vida, como no servidor: o aquecimento e o THREADPOOL_SIZE são
+aplicados, e as rotas usam as dependências reais (`get_session` e a
+sessão somente leitura de `get_read_session`) sobre o banco do
+benchmark. O descarte de carga e o agrupamento de leituras idênticas
+ficam desabilitados por padrão, para que cada requisição execute a
+rota; `--load-shedding` e `--coalesce` os habilitam, e as respostas
+503 do descarte são contadas à parte.
+
+Por padrão o banco é um SQLite temporário em arquivo, para que as
+threads das rotas síncronas usem conexões próprias; `--database-url`
+aponta para outro banco, que deve estar vazio e migrado.
+
+Uso:
+    python -m benchmarks.load --requests 500 --concurrency 16 \\
+        --output load.json --baseline baseline.json --tolerance 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from pathlib import Path
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from fastapi_do_zero.app import create_app
+from fastapi_do_zero.database import get_engine
+from fastapi_do_zero.models import Todo, TodoState, User, table_registry
+from fastapi_do_zero.security import get_password_hash
+from fastapi_do_zero.settings import Settings, get_settings
+
+PASSWORD = 'bench-senha'
+
+
+@dataclass
+class Result:
+    """
+    Resultado de um cenário.
+
+    Attributes:
+        requests (int): Quantidade de requisições disparadas.
+        errors (int): Respostas com status diferente do esperado, sem
+        contar as rejeitadas pelo descarte de carga.
+        shed (int): Respostas 503 do descarte de carga.
+        throughput (float): Requisições por segundo.
+        p50_ms (float): Mediana da latência, em milissegundos.
+        p95_ms (float): Percentil 95 da latência, em milissegundos.
+        p99_ms (float): Percentil 99 da latência, em milissegundos.
+    """
+
+    requests: int
+    errors: int
+    shed: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def configure(url: str, load_shedding: bool, coalesce: bool) -> Settings:
+    """
+    Aponta as configurações da aplicação para o banco do benchmark.
+
+    As configurações são lidas novamente do ambiente, então o engine
+    criado por `get_engine` e as rotas usam o banco e as opções abaixo.
+
+    Args:
+        url (str): A URL do banco.
+        load_shedding (bool): Habilita o descarte de carga.
+        coalesce (bool): Habilita o agrupamento de leituras idênticas.
+
+    Returns:
+        Settings: As configurações usadas pela aplicação.
+    """
+    os.environ.update({
+        'DATABASE_URL': url,
+        'LOAD_SHEDDING_ENABLED': str(load_shedding),
+        'SINGLE_FLIGHT_ENABLED': str(coalesce),
+    })
+    get_settings.cache_clear()
+    get_engine.cache_clear()
+    return get_settings()
+
+
+def create_database(engine, todos: int) -> int:
+    """
+    Cria as tabelas e os dados usados pelos cenários.
+
+    Args:
+        engine (Engine): O engine do banco do benchmark.
+        todos (int): A quantidade de tarefas do usuário do benchmark.
+
+    Returns:
+        int: O id do usuário do benchmark.
+    """
+    table_registry.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        user = User(
+            username='bench',
+            password=get_password_hash(PASSWORD),
+            email='bench@bench.com',
+        )
+        session.add(user)
+        session.flush()
+        session.execute(
+            insert(Todo),
+            [
+                {
+                    'title': f'Tarefa {n}',
+                    'description': 'Descrição da tarefa ' * 5,
+                    'state': TodoState.todo,
+                    'user_id': user.id,
+                }
+                for n in range(todos)
+            ],
+        )
+        session.commit()
+        return user.id
+
+
+async def create_todos(client, headers, count: int) -> list[int]:
+    """Cria tarefas para os cenários de alteração e exclusão."""
+    ids = []
+    for n in range(count):
+        response = await client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': f'T{n}', 'description': 'd', 'state': 'todo'},
+        )
+        ids.append(response.json()['id'])
+    return ids
+
+
+def scenarios(user_id: int, headers: dict, todo_ids: list[int]):
+    """
+    Monta os cenários do benchmark.
+
+    Cada cenário é uma função que recebe o número da requisição e
+    retorna os argumentos de `client.request` e o status esperado.
+    """
+    deletable = iter(todo_ids)
+    patchable = todo_ids[-1]
+
+    return {
+        'POST /auth/token': lambda n: (
+            {
+                'method': 'POST',
+                'url': '/auth/token',
+                'data': {'username': 'bench', 'password': PASSWORD},
+            },
+            200,
+        ),
+        'GET /todos/': lambda n: (
+            {'method': 'GET', 'url': '/todos/', 'headers': headers},
+            200,
+        ),
+        'POST /todos/': lambda n: (
+            {
+                'method': 'POST',
+                'url': '/todos/',
+                'headers': headers,
+                'json': {'title': 'T', 'description': 'd', 'state': 'todo'},
+            },
+            200,
+        ),
+        'PATCH /todos/{todo_id}': lambda n: (
+            {
+                'method': 'PATCH',
+                'url': f'/todos/{patchable}',
+                'headers': headers,
+                'json': {'title': f'T{n}'},
+            },
+            200,
+        ),
+        'DELETE /todos/{todo_id}': lambda n: (
+            {
+                'method': 'DELETE',
+                'url': f'/todos/{next(deletable)}',
+                'headers': headers,
+            },
+            200,
+        ),
+        'GET /users/': lambda n: ({'method': 'GET', 'url': '/users/'}, 200),
+        'GET /users/{user_id}': lambda n: (
+            {'method': 'GET', 'url': f'/users/{user_id}'},
+            200,
+        ),
+        'POST /users/': lambda n: (
+            {
+                'method': 'POST',
+                'url': '/users/',
+                'json': {
+                    'username': f'load{n}',
+                    'email': f'load{n}@bench.com',
+                    'password': PASSWORD,
+                },
+            },
+            201,
+        ),
+        'PATCH /users/{user_id}': lambda n: (
+            {
+                'method': 'PATCH',
+                'url': f'/users/{user_id}',
+                'headers': headers,
+                'json': {'email': f'bench{n}@bench.com'},
+            },
+            200,
+        ),
+    }
+
+
+def percentile(timings: list[float], value: int) -> float:
+    if len(timings) < 2:  # noqa: PLR2004
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method='inclusive')[value - 1]
+
+
+async def run_scenario(client, build, requests: int, concurrency: int):
+    """
+    Executa um cenário com a concorrência configurada.
+
+    Args:
+        client (AsyncClient): O cliente HTTP.
+        build (Callable): A função que monta cada requisição.
+        requests (int): A quantidade de requisições.
+        concurrency (int): A quantidade de requisições simultâneas.
+
+    Returns:
+        Result: A vazão e as latências do cenário.
+    """
+    pending = iter(range(requests))
+    timings = []
+    errors = 0
+    shed = 0
+
+    async def worker():
+        nonlocal errors, shed
+        for n in pending:
+            arguments, expected = build(n)
+            start = time.perf_counter()
+            response = await client.request(**arguments)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code == expected:
+                continue
+            if response.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
+                shed += 1
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return Result(
+        requests=requests,
+        errors=errors,
+        shed=shed,
+        throughput=round(requests / elapsed, 2),
+        p50_ms=round(percentile(timings, 50), 3),
+        p95_ms=round(percentile(timings, 95), 3),
+        p99_ms=round(percentile(timings, 99), 3),
+    )
+
+
+async def run(app, args, user_id: int) -> dict[str, Result]:
+    """
+    Executa os cenários dentro do ciclo de vida da aplicação.
+
+    Args:
+        app (FastAPI): A aplicação do benchmark.
+        args (Namespace): Os argumentos da linha de comando.
+        user_id (int): O id do usuário do benchmark.
+
+    Returns:
+        dict[str, Result]: O resultado de cada cenário executado.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(
+            transport=transport, base_url='http://bench'
+        ) as client,
+    ):
+        response = await client.post(
+            '/auth/token', data={'username': 'bench', 'password': PASSWORD}
+        )
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        todo_ids = await create_todos(client, headers, args.requests + 1)
+
+        results = {}
+        for name, build in scenarios(user_id, headers, todo_ids).items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = await run_scenario(
+                client, build, args.requests, args.concurrency
+            )
+            print(
+                f'{name:<26} {results[name].throughput:9.1f} req/s'
+                f'  p50 {results[name].p50_ms:8.2f} ms'
+                f'  p95 {results[name].p95_ms:8.2f} ms'
+                f'  p99 {results[name].p99_ms:8.2f} ms'
+                f'  erros {results[name].errors}'
+                f'  descartadas {results[name].shed}'
+            )
+        return results
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compara os resultados com o baseline.
+
+    Um cenário regride se o p95 aumentar ou a vazão cair mais que a
+    tolerância.
+
+    Args:
+        results (dict): Os resultados atuais, por cenário.
+        baseline (dict): Os resultados de referência, por cenário.
+        tolerance (float): A variação aceita, ex.: 0.1 para 10%.
+
+    Returns:
+        list[str]: A descrição de cada regressão encontrada.
+    """
+    found = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            found.append(
+                f'{name}: p95 {result["p95_ms"]} ms '
+                f'(baseline {reference["p95_ms"]} ms)'
+            )
+        if result['throughput'] < reference['throughput'] * (1 - tolerance):
+            found.append(
+                f'{name}: vazão {result["throughput"]} req/s '
+                f'(baseline {reference["throughput"]} req/s)'
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--todos', type=int, default=50)
+    parser.add_argument('--database-url')
+    parser.add_argument('--only', nargs='*', help='Cenários a executar')
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument(
+        '--load-shedding',
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help='Habilita o descarte de carga com respostas 503',
+    )
+    parser.add_argument(
+        '--coalesce',
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help='Habilita o agrupamento de leituras idênticas',
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # O timeout faz as escritas concorrentes no SQLite esperarem
+        # pelo bloqueio do banco em vez de falharem
+        url = args.database_url or f'sqlite:///{directory}/load.db?timeout=30'
+        settings = configure(url, args.load_shedding, args.coalesce)
+        engine = get_engine()
+        user_id = create_database(engine, args.todos)
+        app = create_app(settings)
+        try:
+            results = {
+                name: asdict(result)
+                for name, result in asyncio.run(
+                    run(app, args, user_id)
+                ).items()
+            }
+        finally:
+            engine.dispose()
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    'requests': args.requests,
+                    'concurrency': args.concurrency,
+                    'load_shedding': args.load_shedding,
+                    'coalesce': args.coalesce,
+                    'results': results,
+                },
+                indent=2,
+            )
+        )
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())['results']
+        found = regressions(results, baseline, args.tolerance)
+        for regression in found:
+            print(f'REGRESSÃO {regression}')
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Micro-benchmarks das funções de segurança e da serialização.
+
+Mede, para cada função, o melhor tempo por chamada (timeit, com o
+menor valor entre as repetições) e o pico de memória alocada em uma
+chamada (tracemalloc):
+
+- `create_access_token` e a decodificação do JWT feita em
+  `get_current_user`;
+- `get_password_hash` e `verify_password`;
+- a serialização de TodoList e UserList com SchemaResponse.
+
+Uso:
+    python -m benchmarks.micro --items 10 1000 10000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from jwt import decode
+
+from benchmarks.serialization import make_todos
+from fastapi_do_zero.models import User
+from fastapi_do_zero.responses import SchemaResponse
+from fastapi_do_zero.schemas import TodoList, UserList
+from fastapi_do_zero.security import (
+    create_access_token,
+    get_password_hash,
+    verify_password,
+)
+from fastapi_do_zero.settings import get_settings
+
+
+def make_users(items: int) -> list[User]:
+    """
+    Cria usuários em memória, como se tivessem sido lidos do banco.
+
+    Args:
+        items (int): A quantidade de usuários.
+
+    Returns:
+        list[User]: Os usuários criados.
+    """
+    now = datetime.now()
+    users = []
+    for index in range(items):
+        user = User(
+            username=f'usuario{index}',
+            password='x',
+            email=f'usuario{index}@example.com',
+        )
+        user.id = index + 1
+        user.created_at = now
+        user.updated_at = now
+        users.append(user)
+    return users
+
+
+def measure(function, repeat: int) -> tuple[float, float]:
+    """
+    Mede o tempo por chamada e o pico de memória da função.
+
+    O número de chamadas por repetição é escolhido pelo timeit para
+    que cada repetição dure ao menos 0,2 segundo.
+
+    Args:
+        function (Callable): A função a ser medida.
+        repeat (int): A quantidade de repetições.
+
+    Returns:
+        tuple[float, float]: O melhor tempo por chamada em
+        microssegundos e o pico de memória em KiB.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best * 1_000_000, peak / 1024
+
+
+def report(name: str, function, repeat: int):
+    elapsed, peak = measure(function, repeat)
+    print(f'  {name:<28} {elapsed:12.1f} µs  pico {peak:10.1f} KiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--items', type=int, nargs='+', default=[10, 1000, 10_000]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    token = create_access_token({'sub': 'usuario'})
+    hashed = get_password_hash('senha')
+
+    print('segurança')
+    report(
+        'create_access_token',
+        lambda: create_access_token({'sub': 'usuario'}),
+        args.repeat,
+    )
+    report(
+        'decode do JWT',
+        lambda: decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        ),
+        args.repeat,
+    )
+    report('get_password_hash', lambda: get_password_hash('senha'), 1)
+    report('verify_password', lambda: verify_password('senha', hashed), 1)
+
+    for items in args.items:
+        todos = {'todos': make_todos(items)}
+        users = {'users': make_users(items)}
+
+        print(f'{items} itens')
+        report(
+            'TodoList',
+            lambda: SchemaResponse(TodoList, todos, exclude_unset=True).body,
+            args.repeat,
+        )
+        report(
+            'UserList',
+            lambda: SchemaResponse(UserList, users, exclude_unset=True).body,
+            args.repeat,
+        )
+
+
+if __name__ == '__main__':
+    main()
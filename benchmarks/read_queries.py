@@ -0,0 +1,126 @@
+"""
+Benchmark das leituras de tarefas: objetos do ORM x colunas.
+
+Compara a listagem de tarefas carregando objetos `Todo` completos na
+sessão (identity map) com a seleção apenas das colunas de TodoPublic,
+incluindo a serialização com SchemaResponse. Mede a mediana do tempo
+e o pico de memória alocada (tracemalloc).
+
+Uso:
+    python -m benchmarks.read_queries --rows 10000
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from fastapi_do_zero.models import Todo, TodoState, User, table_registry
+from fastapi_do_zero.responses import SchemaResponse
+from fastapi_do_zero.routers.todo import TODO_PUBLIC_COLUMNS
+from fastapi_do_zero.schemas import TodoList
+
+
+def create_database(rows: int):
+    """
+    Cria um banco SQLite em memória com um usuário e suas tarefas.
+
+    Args:
+        rows (int): A quantidade de tarefas.
+
+    Returns:
+        Engine: O engine do banco criado.
+    """
+    engine = create_engine(
+        'sqlite:///:memory:',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool,
+    )
+    table_registry.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.add(User(username='bench', password='x', email='b@b.com'))
+        session.flush()
+        session.execute(
+            insert(Todo),
+            [
+                {
+                    'title': f'Tarefa {n}',
+                    'description': 'Descrição da tarefa ' * 10,
+                    'state': TodoState.todo,
+                    'user_id': 1,
+                }
+                for n in range(rows)
+            ],
+        )
+        session.commit()
+
+    return engine
+
+
+def read_entities(engine) -> bytes:
+    """Lista as tarefas carregando objetos Todo completos."""
+    with Session(engine) as session:
+        todos = session.scalars(select(Todo).where(Todo.user_id == 1)).all()
+        return SchemaResponse(TodoList, {'todos': todos}).body
+
+
+def read_columns(engine) -> bytes:
+    """Lista as tarefas selecionando apenas as colunas de TodoPublic."""
+    with Session(engine) as session:
+        todos = session.execute(
+            select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == 1)
+        ).all()
+        return SchemaResponse(TodoList, {'todos': todos}).body
+
+
+def measure(function, engine, repeat: int) -> tuple[float, float]:
+    """
+    Mede a mediana do tempo e o pico de memória da função.
+
+    Args:
+        function (Callable): A função de leitura.
+        engine (Engine): O engine do banco.
+        repeat (int): A quantidade de execuções para medir o tempo.
+
+    Returns:
+        tuple[float, float]: A mediana em milissegundos e o pico de
+        memória em MiB.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(engine)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    function(engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_database(args.rows)
+
+    print(f'{args.rows} tarefas')
+    for name, function in (
+        ('objetos do ORM', read_entities),
+        ('colunas', read_columns),
+    ):
+        median, peak = measure(function, engine, args.repeat)
+        print(f'  {name:<16} {median:9.3f} ms  pico {peak:8.2f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark da serialização das respostas de listagem de tarefas.
+
+Compara o caminho padrão do FastAPI (validação pelo `response_model`,
+conversão para dicionários e geração do JSON pela classe de resposta)
+com a `SchemaResponse`, que gera os bytes do JSON direto do schema.
+
+Uso:
+    python -m benchmarks.serialization --items 10 1000 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from fastapi_do_zero.models import Todo, TodoState
+from fastapi_do_zero.responses import SchemaResponse
+from fastapi_do_zero.schemas import TodoList
+
+
+def make_todos(items: int) -> list[Todo]:
+    """
+    Cria tarefas em memória, como se tivessem sido lidas do banco.
+
+    Args:
+        items (int): A quantidade de tarefas.
+
+    Returns:
+        list[Todo]: As tarefas criadas.
+    """
+    now = datetime.now()
+    todos = []
+    for index in range(items):
+        todo = Todo(
+            title=f'Tarefa {index}',
+            description='Descrição da tarefa ' * 10,
+            state=TodoState.todo,
+            user_id=1,
+        )
+        todo.id = index + 1
+        todo.created_at = now
+        todo.updated_at = now
+        todos.append(todo)
+    return todos
+
+
+async def fastapi_path(field, response_class, content) -> bytes:
+    """
+    Serializa o conteúdo como o FastAPI faz com `response_model`.
+
+    Args:
+        field (ModelField): O campo de resposta criado para o schema.
+        response_class (type[Response]): A classe de resposta usada
+        para gerar o JSON.
+        content: O conteúdo retornado pela rota.
+
+    Returns:
+        bytes: O corpo da resposta.
+    """
+    data = await serialize_response(
+        field=field, response_content=content, exclude_unset=True
+    )
+    return response_class(data).body
+
+
+def measure(function, repeat: int) -> float:
+    """
+    Mede a mediana, em milissegundos, de várias execuções da função.
+
+    Args:
+        function (Callable): A função a ser medida.
+        repeat (int): A quantidade de execuções.
+
+    Returns:
+        float: A mediana do tempo de execução em milissegundos.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--items', type=int, nargs='+', default=[10, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    field = create_response_field('response', TodoList)
+    loop = asyncio.new_event_loop()
+
+    for items in args.items:
+        content = {'todos': make_todos(items)}
+        results = {
+            'fastapi + JSONResponse': lambda: loop.run_until_complete(
+                fastapi_path(field, JSONResponse, content)
+            ),
+            'fastapi + ORJSONResponse': lambda: loop.run_until_complete(
+                fastapi_path(field, ORJSONResponse, content)
+            ),
+            'SchemaResponse': lambda: SchemaResponse(
+                TodoList, content, exclude_unset=True
+            ).body,
+        }
+
+        print(f'{items} tarefas')
+        for name, function in results.items():
+            print(f'  {name:<26} {measure(function, args.repeat):8.3f} ms')
+
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
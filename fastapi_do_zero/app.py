@@ -1,17 +1,55 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
-from fastapi_do_zero.routers import auth, todo, users
+from fastapi_do_zero.compression import CompressionMiddleware
+from fastapi_do_zero.database import get_engine
+from fastapi_do_zero.instrumentation import RequestStatsMiddleware
+from fastapi_do_zero.load_shedding import LoadSheddingMiddleware
+from fastapi_do_zero.metrics import MetricsMiddleware, registry
+from fastapi_do_zero.profiling import ProfilingMiddleware
+from fastapi_do_zero.responses import TimedORJSONResponse
+from fastapi_do_zero.routers import admin, auth, health, metrics, todo, users
 from fastapi_do_zero.schemas import Message
+from fastapi_do_zero.settings import Settings, get_settings
+from fastapi_do_zero.warmup import warm_up
 
-app = FastAPI()
-app.include_router(auth.router)
-app.include_router(todo.router)
-app.include_router(users.router)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação.
+
+    Ajusta o tamanho do pool de threads das rotas síncronas e aquece
+    a aplicação antes de aceitar requisições; só então marca
+    `app.state.ready`. No desligamento, marca `app.state.draining`
+    para que o /readyz retire a instância do balanceador enquanto as
+    requisições em andamento terminam. A gravação das métricas do
+    worker no diretório compartilhado roda durante todo o ciclo.
+
+    Args:
+        app (FastAPI): A aplicação, com as configurações usadas na sua
+        criação em `app.state.settings`.
+    """
+    settings = app.state.settings
+    app.state.ready = False
+    app.state.draining = False
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.THREADPOOL_SIZE
+    if settings.WARMUP_ENABLED:
+        await run_in_threadpool(
+            warm_up, get_engine(), settings.WARMUP_CONNECTIONS
+        )
+    registry.start()
+    app.state.ready = True
+    yield
+    app.state.draining = True
+    await run_in_threadpool(registry.stop)
 
 
-@app.get('/', status_code=HTTPStatus.OK, response_model=Message)
 def read_root():
     """
     Endpoint raiz que retorna uma mensagem de Olá Mundo.
@@ -22,3 +60,77 @@ def read_root():
         dict: Uma mensagem de Olá Mundo.
     """
     return {'message': 'Olá Mundo!'}
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Cria a aplicação com os middlewares habilitados nas configurações.
+
+    A pilha de middlewares não pode ser alterada depois que a aplicação
+    começa a receber requisições, por isso as configurações são lidas
+    aqui, e não no ciclo de vida.
+
+    Args:
+        settings (Settings | None): As configurações da aplicação. None
+        usa as lidas do ambiente por `get_settings`.
+
+    Returns:
+        FastAPI: A aplicação configurada.
+    """
+    settings = settings or get_settings()
+
+    app = FastAPI(
+        default_response_class=TimedORJSONResponse, lifespan=lifespan
+    )
+    app.state.settings = settings
+
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+            zstd_level=settings.ZSTD_COMPRESSION_LEVEL,
+        )
+
+    app.add_middleware(
+        RequestStatsMiddleware,
+        server_timing=settings.SERVER_TIMING_ENABLED,
+        debug=settings.DEBUG,
+        query_warning_threshold=settings.QUERY_COUNT_WARNING_THRESHOLD,
+    )
+
+    if settings.LOAD_SHEDDING_ENABLED:
+        app.add_middleware(
+            LoadSheddingMiddleware,
+            limits=settings.LOAD_SHEDDING_LIMITS,
+            max_queue=settings.LOAD_SHEDDING_MAX_QUEUE,
+            retry_after=settings.LOAD_SHEDDING_RETRY_AFTER,
+        )
+
+    if settings.METRICS_ENABLED:
+        registry.configure(settings.METRICS_DIR)
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
+
+    if settings.PROFILING_TOKEN:
+        app.add_middleware(
+            ProfilingMiddleware,
+            token=settings.PROFILING_TOKEN,
+            directory=settings.PROFILING_DIR,
+            min_interval=settings.PROFILING_MIN_INTERVAL,
+        )
+
+    app.include_router(health.router)
+    app.include_router(auth.router)
+    app.include_router(todo.router)
+    app.include_router(users.router)
+    app.include_router(admin.router)
+    app.add_api_route(
+        '/', read_root, status_code=HTTPStatus.OK, response_model=Message
+    )
+
+    return app
+
+
+# Aplicação usada pelo servidor (`fastapi_do_zero.app:app`) e pelos testes
+app = create_app()
@@ -0,0 +1,238 @@
+"""
+Compressão das respostas HTTP (gzip e zstd).
+
+A compressão é negociada pelo cabeçalho Accept-Encoding. O zstd só é
+oferecido quando o pacote opcional `zstandard` está instalado.
+Respostas menores que o tamanho mínimo são enviadas sem compressão.
+Todas as respostas, comprimidas ou não, recebem `Vary: Accept-Encoding`,
+para que caches compartilhados não entreguem uma versão a um cliente
+que pediu outra.
+Respostas em streaming são comprimidas bloco a bloco, sem acumular o
+corpo inteiro em memória.
+"""
+
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fastapi_do_zero.responses import header_qualities
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+def available_encodings() -> list[str]:
+    """
+    Lista as codificações suportadas, em ordem de preferência.
+
+    Returns:
+        list[str]: 'zstd' (se disponível) e 'gzip'.
+    """
+    if zstandard is None:  # pragma: no cover
+        return ['gzip']
+    return ['zstd', 'gzip']
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Escolhe a codificação da resposta a partir do Accept-Encoding.
+
+    Entre as codificações aceitas com a mesma qualidade, o zstd tem
+    preferência sobre o gzip.
+
+    Args:
+        accept_encoding (str | None): O valor do cabeçalho.
+
+    Returns:
+        str | None: A codificação escolhida ou None para não comprimir.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = header_qualities(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = qualities.get(encoding, qualities.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compressor_for(encoding: str, level: int):
+    """
+    Cria um compressor incremental para a codificação.
+
+    Args:
+        encoding (str): 'gzip' ou 'zstd'.
+        level (int): O nível de compressão.
+
+    Returns:
+        O compressor, com os métodos `compress` e `flush`.
+    """
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    # wbits=31 gera o cabeçalho e o rodapé do formato gzip
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def compress(encoding: str, level: int, body: bytes) -> bytes:
+    """
+    Comprime um corpo completo de uma só vez.
+
+    Args:
+        encoding (str): 'gzip' ou 'zstd'.
+        level (int): O nível de compressão.
+        body (bytes): O corpo da resposta.
+
+    Returns:
+        bytes: O corpo comprimido. No zstd, o quadro inclui o tamanho
+        original, o que permite ao cliente alocar o buffer de uma vez.
+    """
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    return gzip.compress(body, compresslevel=level)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime as respostas com gzip ou zstd.
+
+    Args:
+        app (ASGIApp): A aplicação ASGI.
+        minimum_size (int): Tamanho mínimo, em bytes, para comprimir
+        uma resposta completa.
+        gzip_level (int): Nível de compressão do gzip (1 a 9).
+        zstd_level (int): Nível de compressão do zstd (1 a 22).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {'gzip': gzip_level, 'zstd': zstd_level}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding'))
+        responder = CompressionResponder(
+            self.app, encoding, self.levels.get(encoding), self.minimum_size
+        )
+        await responder(scope, receive, send)
+
+
+class CompressionResponder:
+    """
+    Comprime a resposta de uma única requisição.
+
+    A mensagem de início da resposta é retida até o primeiro bloco do
+    corpo, pois só então se sabe se a resposta é completa (e pequena o
+    bastante para não ser comprimida) ou em streaming. Sem codificação
+    (`encoding` None), a resposta apenas recebe o cabeçalho Vary.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encoding: str | None,
+        level: int | None,
+        minimum_size: int,
+    ):
+        self.app = app
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start_message = None
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message['type'] == 'http.response.start':
+            self.start_message = message
+            return
+
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.start_message is not None:
+            start_message, self.start_message = self.start_message, None
+            if await self.start(start_message, body, more_body):
+                return
+
+        if self.compressor is None:
+            await self.send(message)
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+
+        await self.send({
+            'type': 'http.response.body',
+            'body': data,
+            'more_body': more_body,
+        })
+
+    async def start(
+        self, start_message: Message, body: bytes, more_body: bool
+    ) -> bool:
+        """
+        Decide se a resposta será comprimida e envia o seu início.
+
+        Args:
+            start_message (Message): A mensagem de início da resposta.
+            body (bytes): O primeiro bloco do corpo.
+            more_body (bool): Se a resposta tem mais blocos.
+
+        Returns:
+            bool: True se o primeiro bloco já foi enviado, comprimido.
+        """
+        headers = MutableHeaders(raw=start_message['headers'])
+
+        # Respostas já codificadas pela aplicação não são alteradas
+        if 'content-encoding' in headers:
+            await self.send(start_message)
+            return False
+
+        # A resposta depende do Accept-Encoding mesmo quando não é
+        # comprimida: pequena demais ou sem codificação aceita
+        headers.add_vary_header('Accept-Encoding')
+
+        too_small = not more_body and len(body) < self.minimum_size
+        if self.encoding is None or too_small:
+            await self.send(start_message)
+            return False
+
+        headers['Content-Encoding'] = self.encoding
+
+        if more_body:
+            # O tamanho final de uma resposta em streaming não é conhecido
+            del headers['Content-Length']
+            self.compressor = compressor_for(self.encoding, self.level)
+            await self.send(start_message)
+            return False
+
+        compressed = compress(self.encoding, self.level, body)
+        headers['Content-Length'] = str(len(compressed))
+        await self.send(start_message)
+        await self.send({'type': 'http.response.body', 'body': compressed})
+        return True
@@ -1,11 +1,103 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+import os
+from functools import cache
 
-from .settings import Settings
+from sqlalchemy import (
+    Engine,
+    Select,
+    create_engine,
+    event,
+    func,
+    make_url,
+    select,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-# Cria um engine do SQLAlchemy usando a URL de
-# banco de dados definida nas configurações
-engine = create_engine(Settings().DATABASE_URL)
+from .instrumentation import instrument_engine
+from .metrics import pool_collector, registry
+from .settings import get_settings
+from .slow_queries import recorder
+
+
+@cache
+def get_engine() -> Engine:
+    """
+    Obtém o engine do SQLAlchemy, criando-o na primeira chamada.
+
+    O engine não é criado na importação do módulo: a importação fica
+    mais rápida e o driver do banco só é carregado quando a primeira
+    conexão for necessária.
+
+    Returns:
+        Engine: O engine configurado com a URL de `DATABASE_URL` e,
+        quando o pool tem tamanho fixo, com `DB_POOL_SIZE` e
+        `DB_MAX_OVERFLOW`.
+    """
+    settings = get_settings()
+    url = make_url(settings.DATABASE_URL)
+    options = {}
+    # Apenas o QueuePool tem tamanho e overflow; o SQLite em memória,
+    # por exemplo, usa um pool de uma conexão por thread
+    if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        options = {
+            'pool_size': settings.DB_POOL_SIZE,
+            'max_overflow': settings.DB_MAX_OVERFLOW,
+        }
+    engine = create_engine(url, **options)
+
+    # Mede o tempo e a quantidade de consultas de cada requisição
+    instrument_engine(engine)
+
+    # Expõe no /metrics as estatísticas do pool de conexões
+    registry.collectors.append(pool_collector(engine))
+
+    if settings.SLOW_QUERY_LOG_ENABLED:  # pragma: no cover
+        recorder.configure(
+            settings.SLOW_QUERY_THRESHOLD_MS,
+            settings.SLOW_QUERY_LOG_SIZE,
+            settings.SLOW_QUERY_EXPLAIN,
+        )
+        recorder.install(engine)
+
+    return engine
+
+
+def dispose_engine_after_fork():
+    """
+    Descarta, no processo filho, as conexões herdadas do processo pai.
+
+    Conexões abertas antes de um `fork` não podem ser compartilhadas
+    entre os processos. Com `close=False` o filho apenas esquece as
+    conexões do pool, sem fechá-las, e abre as suas quando precisar;
+    o processo pai continua usando as dele normalmente.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=dispose_engine_after_fork)
+
+
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """
+    Habilita as chaves estrangeiras em conexões SQLite.
+
+    O SQLite só aplica as chaves estrangeiras, e portanto o
+    ON DELETE CASCADE das tarefas, quando `PRAGMA foreign_keys`
+    está ativo na conexão. A conexão é identificada pelo módulo da sua
+    classe, sem importar o `sqlite3`, que só é carregado pelo driver
+    quando o banco é SQLite.
+
+    Args:
+        dbapi_connection: A conexão DBAPI recém-criada.
+        connection_record: O registro da conexão no pool.
+    """
+    if type(dbapi_connection).__module__ == 'sqlite3':
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
 
 
 def get_session():  # pragma: no cover
@@ -20,5 +112,78 @@ def get_session():  # pragma: no cover
     Yields:
         Session: Uma sessão de banco de dados configurada.
     """
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
+        yield session
+
+
+# Fábrica das sessões somente leitura: sem autoflush, pois nada é escrito,
+# e sem expirar os objetos, que continuam legíveis após o fechamento
+ReadSession = sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+@event.listens_for(ReadSession, 'after_begin')
+def set_transaction_read_only(session, transaction, connection):
+    """
+    Marca como somente leitura as transações das sessões de leitura.
+
+    No PostgreSQL é executado `SET TRANSACTION READ ONLY`. No SQLite
+    nada é necessário: o driver só abre a transação (deferred) antes
+    de uma escrita, então as leituras não bloqueiam o banco.
+
+    Args:
+        session (Session): A sessão que iniciou a transação.
+        transaction (SessionTransaction): A transação iniciada.
+        connection (Connection): A conexão da transação.
+    """
+    if connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+def get_read_session():  # pragma: no cover
+    """
+    Obtém uma sessão de banco de dados somente leitura.
+
+    Deve ser usada pelas rotas que apenas consultam dados. A conexão
+    volta para o pool assim que a sessão é fechada, o que pode ser
+    feito antes do fim da requisição com `session.close()`; a sessão
+    continua utilizável e obtém uma nova conexão se necessário.
+
+    Yields:
+        Session: Uma sessão de banco de dados somente leitura.
+    """
+    with ReadSession(bind=get_engine()) as session:
         yield session
+
+
+def rows_with_total(session: Session, query: Select):
+    """
+    Executa uma consulta paginada retornando também o total de registros.
+
+    O total é calculado com a função de janela `COUNT(*) OVER ()` na
+    mesma instrução, evitando uma segunda ida ao banco de dados. Apenas
+    quando a página solicitada está vazia é feita uma contagem separada,
+    pois nenhuma linha carrega o total: o deslocamento (offset) pode ter
+    ultrapassado os registros ou o limite pode ser zero.
+
+    Args:
+        session (Session): A sessão de banco de dados a ser utilizada.
+        query (Select): A consulta de colunas já filtrada e paginada.
+
+    Returns:
+        tuple[list[Row], int]: As linhas da página, com as colunas da
+        consulta e a coluna `total`, e o total de registros que
+        correspondem aos filtros.
+    """
+    rows = session.execute(
+        query.add_columns(func.count().over().label('total'))
+    ).all()
+
+    if rows:
+        return rows, rows[0].total
+
+    total = session.scalar(
+        select(func.count()).select_from(
+            query.limit(None).offset(None).subquery()
+        )
+    )
+    return [], total
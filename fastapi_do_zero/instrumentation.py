@@ -0,0 +1,241 @@
+"""
+Instrumentação por requisição: tempo de banco, de hash e de serialização.
+
+O `RequestStatsMiddleware` cria um `RequestStats` para cada requisição
+e o guarda em uma ContextVar. Como o FastAPI copia o contexto para as
+threads que executam as rotas síncronas, os eventos do engine e os
+trechos medidos com `timed` acumulam os tempos no objeto da requisição
+corrente, sem precisar receber a requisição como argumento.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import orjson
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    """
+    Tempos acumulados durante uma requisição.
+
+    Attributes:
+        db_time (float): Tempo gasto executando consultas, em segundos.
+        query_count (int): Quantidade de consultas executadas.
+        hash_time (float): Tempo gasto gerando e verificando hashes de
+        senha, em segundos.
+        serialize_time (float): Tempo gasto serializando respostas, em
+        segundos: SchemaResponse, a geração do JSON das demais rotas e
+        a conversão para MessagePack. A validação do `response_model`
+        feita pelo FastAPI não é incluída.
+    """
+
+    db_time: float = 0.0
+    query_count: int = 0
+    hash_time: float = 0.0
+    serialize_time: float = 0.0
+
+
+current_stats: ContextVar[RequestStats | None] = ContextVar(
+    'current_stats', default=None
+)
+
+# O scope ASGI da requisição atual. O roteamento grava a rota escolhida
+# no próprio scope, então ela fica disponível depois de resolvida.
+current_scope: ContextVar[Scope | None] = ContextVar(
+    'current_scope', default=None
+)
+
+
+def current_route() -> str | None:
+    """
+    Identifica a rota da requisição em andamento.
+
+    Returns:
+        str | None: O método e o modelo da rota, ex.: 'GET /todos/',
+        ou None fora de uma requisição instrumentada.
+    """
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = getattr(scope.get('route'), 'path', scope['path'])
+    return f'{scope["method"]} {route}'
+
+
+@contextmanager
+def timed(field: str):
+    """
+    Mede o trecho de código e soma o tempo no campo da requisição atual.
+
+    Fora de uma requisição instrumentada o trecho é apenas executado.
+
+    Args:
+        field (str): O campo de RequestStats, ex.: 'hash_time'.
+    """
+    stats = current_stats.get()
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(
+            stats, field, getattr(stats, field) + time.perf_counter() - start
+        )
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, *a):
+    """
+    Guarda o início da consulta no contexto de execução.
+
+    O contexto pertence a uma única execução, então uma consulta que
+    falha (ex.: IntegrityError) não deixa um início pendente que seria
+    usado pela próxima consulta da conexão.
+    """
+    context.query_start_time = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, *a):
+    """Soma a duração da consulta na requisição atual."""
+    stats = current_stats.get()
+    if stats is not None:
+        stats.db_time += time.perf_counter() - context.query_start_time
+        stats.query_count += 1
+
+
+def instrument_engine(engine: Engine):
+    """
+    Registra no engine os eventos que medem as consultas.
+
+    Args:
+        engine (Engine): O engine a ser instrumentado.
+    """
+    if not event.contains(
+        engine, 'before_cursor_execute', before_cursor_execute
+    ):
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    """
+    Monta o valor do cabeçalho Server-Timing.
+
+    Args:
+        stats (RequestStats): Os tempos da requisição.
+        total (float): O tempo total até o início da resposta, em
+        segundos.
+
+    Returns:
+        str: O cabeçalho, com as durações em milissegundos.
+    """
+    queries = f'desc="{stats.query_count} queries"'
+    return ', '.join([
+        f'db;dur={stats.db_time * 1000:.2f};{queries}',
+        f'hash;dur={stats.hash_time * 1000:.2f}',
+        f'serialize;dur={stats.serialize_time * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ])
+
+
+class RequestStatsMiddleware:
+    """
+    Middleware ASGI que coleta os tempos de cada requisição.
+
+    Com `server_timing`, adiciona o cabeçalho Server-Timing ao iniciar
+    a resposta e registra, ao terminar, uma linha de log estruturada
+    (JSON) com a rota e os tempos. Com `debug`, adiciona o cabeçalho
+    X-Query-Count. Requisições que executam mais consultas que
+    `query_warning_threshold` geram um aviso no log, o que ajuda a
+    detectar consultas N+1.
+
+    Args:
+        app (ASGIApp): A aplicação ASGI.
+        server_timing (bool): Habilita o cabeçalho Server-Timing e o log
+        dos tempos.
+        debug (bool): Habilita o cabeçalho X-Query-Count.
+        query_warning_threshold (int | None): Quantidade de consultas a
+        partir da qual um aviso é registrado. None desabilita o aviso.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        server_timing: bool = True,
+        debug: bool = False,
+        query_warning_threshold: int | None = None,
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.debug = debug
+        self.query_warning_threshold = query_warning_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        # Middlewares aninhados compartilham os tempos da mesma requisição
+        stats = current_stats.get() or RequestStats()
+        token = current_stats.set(stats)
+        scope_token = current_scope.set(scope)
+        start = time.perf_counter()
+        status_code = None
+
+        async def send_with_stats(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = MutableHeaders(scope=message)
+                if self.server_timing:
+                    headers.append(
+                        'Server-Timing',
+                        server_timing(stats, time.perf_counter() - start),
+                    )
+                if self.debug:
+                    headers.append('X-Query-Count', str(stats.query_count))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_stats.reset(token)
+            current_scope.reset(scope_token)
+            route = getattr(scope.get('route'), 'path', scope['path'])
+
+            if (
+                self.query_warning_threshold is not None
+                and stats.query_count > self.query_warning_threshold
+            ):
+                logger.warning(
+                    '%s %s executed %d queries (threshold %d)',
+                    scope['method'],
+                    route,
+                    stats.query_count,
+                    self.query_warning_threshold,
+                )
+
+            if self.server_timing:
+                total = time.perf_counter() - start
+                logger.info(
+                    orjson.dumps({
+                        'method': scope['method'],
+                        'route': route,
+                        'status': status_code,
+                        'total_ms': round(total * 1000, 2),
+                        'db_ms': round(stats.db_time * 1000, 2),
+                        'query_count': stats.query_count,
+                        'hash_ms': round(stats.hash_time * 1000, 2),
+                        'serialize_ms': round(stats.serialize_time * 1000, 2),
+                    }).decode()
+                )
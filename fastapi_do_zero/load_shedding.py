@@ -0,0 +1,143 @@
+"""
+Descarte de carga (load shedding) com respostas 503 imediatas.
+
+As rotas são síncronas e executadas no pool de threads do AnyIO; sob
+sobrecarga, as requisições excedentes ficariam esperando na fila do
+pool até estourar o tempo limite do cliente. O `LoadSheddingMiddleware`
+rejeita essas requisições logo na chegada, com 503 e `Retry-After`,
+quando a classe da rota já tem requisições demais em andamento ou
+quando a fila do pool de threads passou do limite.
+
+O estado fica no próprio worker: os contadores só são alterados no
+loop de eventos, então dispensam travas.
+"""
+
+from http import HTTPStatus
+
+from anyio import to_thread
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from fastapi_do_zero.metrics import SHED_REQUESTS
+
+# Rotas que nunca são descartadas: as sondas do balanceador e a coleta
+# de métricas precisam responder justamente durante a sobrecarga.
+EXEMPT_PATHS = frozenset({'/healthz', '/readyz', '/metrics'})
+
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+# Rota de login, que verifica o hash argon2 da senha.
+LOGIN_PATH = '/auth/token'
+
+# Rotas de criação de usuários, que calculam o hash argon2 das senhas.
+USER_CREATION_PATHS = frozenset({'/users/', '/users/bulk'})
+
+
+def route_class(scope: Scope) -> str:
+    """
+    Classifica a requisição pelo custo esperado.
+
+    O middleware roda antes do roteamento, então a classe é decidida
+    pelo caminho e pelo método: 'auth' para as rotas que sempre calculam
+    ou verificam hashes de senha (o login e a criação de usuários,
+    individual ou em lote), 'reads' para leituras e 'writes' para as
+    demais.
+
+    A renovação do token (`/auth/refresh_token`) fica em 'writes': ela
+    apenas decodifica e assina um JWT, sem hash de senha, e não deve
+    ocupar as vagas do login.
+
+    O PUT e o PATCH de `/users/{user_id}` ficam em 'writes': a senha é
+    opcional nessas rotas, o corpo ainda não foi lido quando a classe é
+    decidida, e contá-las como 'auth' faria simples edições de perfil
+    ocuparem as vagas do login.
+
+    Args:
+        scope (Scope): O scope ASGI da requisição.
+
+    Returns:
+        str: A classe da rota.
+    """
+    if scope['method'] == 'POST' and (
+        scope['path'] == LOGIN_PATH or scope['path'] in USER_CREATION_PATHS
+    ):
+        return 'auth'
+    if scope['method'] in READ_METHODS:
+        return 'reads'
+    return 'writes'
+
+
+def threadpool_queue() -> int:
+    """Quantidade de tarefas esperando uma thread livre no pool."""
+    return (
+        to_thread.current_default_thread_limiter().statistics().tasks_waiting
+    )
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware ASGI que rejeita requisições excedentes com 503.
+
+    Args:
+        app (ASGIApp): A aplicação ASGI.
+        limits (dict[str, int]): Máximo de requisições em andamento por
+        classe de rota ('auth', 'reads' e 'writes'). Classes ausentes
+        não têm limite.
+        max_queue (int | None): Máximo de tarefas na fila do pool de
+        threads. None não limita a fila.
+        retry_after (int): Valor, em segundos, do cabeçalho Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, int],
+        max_queue: int | None = None,
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limits = limits
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.in_flight = dict.fromkeys(('auth', 'reads', 'writes'), 0)
+
+    def overloaded(self, kind: str) -> str | None:
+        """
+        Verifica se a requisição deve ser descartada.
+
+        Args:
+            kind (str): A classe da rota.
+
+        Returns:
+            str | None: O motivo do descarte ('in_flight' ou 'queue'),
+            ou None se a requisição pode seguir.
+        """
+        limit = self.limits.get(kind)
+        if limit is not None and self.in_flight[kind] >= limit:
+            return 'in_flight'
+        if self.max_queue is not None and threadpool_queue() >= self.max_queue:
+            return 'queue'
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or scope['path'] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        kind = route_class(scope)
+        reason = self.overloaded(kind)
+        if reason is not None:
+            SHED_REQUESTS.inc(kind, reason)
+            response = ORJSONResponse(
+                {'detail': 'Service overloaded, try again later'},
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight[kind] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[kind] -= 1
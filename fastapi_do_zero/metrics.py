@@ -0,0 +1,601 @@
+"""
+Métricas da aplicação no formato de exposição do Prometheus.
+
+As métricas ficam em memória, por processo. Cada série é uma lista de
+números atualizada sob uma trava própria da métrica, que é mantida só
+durante a soma; os histogramas usam faixas (buckets) fixas, então
+registrar uma observação custa uma busca binária e duas somas.
+
+Com vários workers, cada processo grava periodicamente, em uma thread
+própria (fora do loop de eventos), um retrato das suas métricas em
+`METRICS_DIR`, e o `/metrics` de qualquer worker soma os retratos de
+todos. Contadores e histogramas de workers encerrados continuam somados
+até o próximo início do servidor, que limpa o diretório; gauges só são
+somados para processos vivos.
+"""
+
+import bisect
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Metric:
+    """
+    Métrica com rótulos, armazenada como uma lista de números por série.
+
+    Args:
+        name (str): O nome da métrica.
+        documentation (str): A descrição exibida no `# HELP`.
+        labelnames (tuple[str, ...]): Os nomes dos rótulos.
+    """
+
+    type = 'untyped'
+    width = 1
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, list[float]] = {}
+        self.lock = Lock()
+
+    def new_value(self) -> list[float]:
+        """
+        Cria os valores zerados de uma nova série.
+
+        Returns:
+            list[float]: Uma lista com `width` zeros.
+        """
+        return [0.0] * self.width
+
+    def add(self, labels: tuple, index: int, amount: float):
+        """
+        Soma um valor a uma posição da série, criando-a se necessário.
+
+        Args:
+            labels (tuple): Os valores dos rótulos da série.
+            index (int): A posição da lista de valores.
+            amount (float): O valor a ser somado.
+        """
+        with self.lock:
+            value = self.values.get(labels)
+            if value is None:
+                value = self.values[labels] = self.new_value()
+            value[index] += amount
+
+    def snapshot(self) -> dict[tuple, list[float]]:
+        """
+        Copia os valores de todas as séries.
+
+        Returns:
+            dict[tuple, list[float]]: Os valores de cada série, pelos
+            valores dos rótulos, sem compartilhar as listas internas.
+        """
+        with self.lock:
+            return {
+                labels: list(value) for labels, value in self.values.items()
+            }
+
+    def format_labels(self, labels: tuple, extra: str = '') -> str:
+        """
+        Formata os rótulos de uma série para a exposição.
+
+        Args:
+            labels (tuple): Os valores dos rótulos da série.
+            extra (str): Um par adicional já formatado, ex.: 'le="0.1"'.
+
+        Returns:
+            str: Os rótulos entre chaves, ex.: '{method="GET"}', ou
+            vazio se não houver rótulos.
+        """
+        pairs = [
+            f'{name}="{escape(str(value))}"'
+            for name, value in zip(self.labelnames, labels)
+        ]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self, values: dict[tuple, list[float]]) -> list[str]:
+        """
+        Gera as linhas de exposição da métrica.
+
+        Args:
+            values (dict[tuple, list[float]]): Os valores de cada série,
+            já somados entre os workers.
+
+        Returns:
+            list[str]: As linhas `# HELP`, `# TYPE` e uma por série.
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        for labels, value in sorted(values.items()):
+            lines.append(
+                f'{self.name}{self.format_labels(labels)} {value[0]:g}'
+            )
+        return lines
+
+
+class Counter(Metric):
+    """Contador que só aumenta."""
+
+    type = 'counter'
+
+    def inc(self, *labels, amount: float = 1.0):
+        """
+        Incrementa o contador da série.
+
+        Args:
+            *labels: Os valores dos rótulos da série.
+            amount (float): O incremento.
+        """
+        self.add(labels, 0, amount)
+
+
+class Gauge(Metric):
+    """Valor que pode aumentar e diminuir."""
+
+    type = 'gauge'
+
+    def inc(self, *labels, amount: float = 1.0):
+        """
+        Aumenta o valor da série.
+
+        Args:
+            *labels: Os valores dos rótulos da série.
+            amount (float): O aumento.
+        """
+        self.add(labels, 0, amount)
+
+    def dec(self, *labels, amount: float = 1.0):
+        """
+        Diminui o valor da série.
+
+        Args:
+            *labels: Os valores dos rótulos da série.
+            amount (float): A redução.
+        """
+        self.add(labels, 0, -amount)
+
+    def set(self, value: float, *labels):
+        """
+        Define o valor da série.
+
+        Args:
+            value (float): O novo valor.
+            *labels: Os valores dos rótulos da série.
+        """
+        with self.lock:
+            self.values[labels] = [value]
+
+
+class Histogram(Metric):
+    """
+    Histograma com faixas fixas.
+
+    Cada série guarda a contagem de cada faixa (não acumulada), a da
+    faixa +Inf e, na última posição, a soma dos valores observados.
+    """
+
+    type = 'histogram'
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.width = len(self.buckets) + 2
+
+    def observe(self, amount: float, *labels):
+        """
+        Registra uma observação na faixa correspondente da série.
+
+        Args:
+            amount (float): O valor observado.
+            *labels: Os valores dos rótulos da série.
+        """
+        index = bisect.bisect_left(self.buckets, amount)
+        with self.lock:
+            value = self.values.get(labels)
+            if value is None:
+                value = self.values[labels] = self.new_value()
+            value[index] += 1
+            value[-1] += amount
+
+    @contextmanager
+    def time(self, *labels):
+        """Observa a duração, em segundos, do trecho de código."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self, values: dict[tuple, list[float]]) -> list[str]:
+        """
+        Gera as linhas de exposição do histograma.
+
+        As contagens das faixas são acumuladas, como o formato exige.
+
+        Args:
+            values (dict[tuple, list[float]]): Os valores de cada série,
+            já somados entre os workers.
+
+        Returns:
+            list[str]: As linhas `# HELP` e `# TYPE` e, por série, as
+            linhas `_bucket`, `_sum` e `_count`.
+        """
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        bounds = [f'{bound:g}' for bound in self.buckets] + ['+Inf']
+        for labels, value in sorted(values.items()):
+            cumulative = 0.0
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                le = self.format_labels(labels, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{le} {cumulative:g}')
+            label_text = self.format_labels(labels)
+            lines.append(f'{self.name}_sum{label_text} {value[-1]:g}')
+            lines.append(f'{self.name}_count{label_text} {cumulative:g}')
+        return lines
+
+
+def escape(value: str) -> str:
+    """
+    Escapa o valor de um rótulo para o formato de exposição.
+
+    Args:
+        value (str): O valor do rótulo.
+
+    Returns:
+        str: O valor com barras invertidas, quebras de linha e aspas
+        escapadas.
+    """
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Registry:
+    """
+    Conjunto das métricas expostas pelo `/metrics`.
+
+    Attributes:
+        metrics (list[Metric]): As métricas registradas.
+        collectors (list[Callable]): Funções executadas antes de cada
+        exposição, para atualizar gauges lidos sob demanda.
+        directory (Path | None): Diretório compartilhado entre os
+        workers, quando configurado.
+        flush_interval (float): Intervalo, em segundos, entre as
+        gravações do retrato deste processo.
+    """
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.collectors = []
+        self.directory: Path | None = None
+        self.flush_interval = 1.0
+        self.stopped = Event()
+        self.flusher: Thread | None = None
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Registra uma métrica para ser exposta.
+
+        Args:
+            metric (Metric): A métrica.
+
+        Returns:
+            Metric: A própria métrica, para uso em atribuições.
+        """
+        self.metrics.append(metric)
+        return metric
+
+    def configure(self, directory: str | None, flush_interval: float = 1.0):
+        """
+        Configura a agregação entre workers.
+
+        Args:
+            directory (str | None): O diretório compartilhado ou None
+            para expor apenas as métricas do processo atual.
+            flush_interval (float): Intervalo entre gravações.
+        """
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def collect(self) -> dict[str, dict[tuple, list[float]]]:
+        """
+        Executa os coletores e copia as métricas deste processo.
+
+        Returns:
+            dict: As séries de cada métrica, por nome.
+        """
+        for collector in self.collectors:
+            collector()
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def flush(self):
+        """
+        Grava o retrato das métricas deste processo no diretório
+        compartilhado.
+
+        Faz I/O de arquivo síncrono, então não deve ser chamado no loop
+        de eventos; a gravação periódica roda na thread de `start`.
+        """
+        if not self.directory:
+            return
+
+        data = {
+            name: [[list(labels), value] for labels, value in values.items()]
+            for name, values in self.collect().items()
+        }
+        path = self.directory / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(data))
+        temporary.replace(path)
+
+    def start(self):
+        """
+        Inicia a gravação periódica do retrato em uma thread.
+
+        Deve ser chamado em cada worker, depois de criado o processo.
+        Sem diretório configurado, não faz nada.
+        """
+        if not self.directory or self.flusher is not None:
+            return
+        self.stopped.clear()
+        self.flusher = Thread(
+            target=self.flush_periodically, name='metrics-flush', daemon=True
+        )
+        self.flusher.start()
+
+    def flush_periodically(self):
+        """Grava o retrato a cada `flush_interval` até `stop`."""
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """
+        Interrompe a gravação periódica e grava o retrato final, para
+        que os contadores do worker continuem somados após o seu fim.
+        """
+        if self.flusher is None:
+            return
+        self.stopped.set()
+        self.flusher.join()
+        self.flusher = None
+        self.flush()
+
+    def aggregate(self) -> dict[str, dict[tuple, list[float]]]:
+        """
+        Soma as métricas deste processo com as dos demais workers.
+
+        Returns:
+            dict: As séries de cada métrica, por nome.
+        """
+        totals = self.collect()
+        if not self.directory:
+            return totals
+
+        gauges = {m.name for m in self.metrics if m.type == 'gauge'}
+        for path in self.directory.glob('*.json'):
+            # Arquivos que não são retratos de um worker (ex.: um
+            # tmp.json deixado no diretório) são ignorados
+            try:
+                pid = int(path.stem)
+                if pid == os.getpid():
+                    continue
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            alive = is_alive(pid)
+            for name, series in data.items():
+                if name not in totals or (name in gauges and not alive):
+                    continue
+                for labels, value in series:
+                    current = totals[name].setdefault(
+                        tuple(labels), [0.0] * len(value)
+                    )
+                    for index, amount in enumerate(value):
+                        current[index] += amount
+        return totals
+
+    def render(self) -> str:
+        """
+        Gera o texto de exposição de todas as métricas.
+
+        Returns:
+            str: As métricas no formato de texto do Prometheus.
+        """
+        totals = self.aggregate()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render(totals[metric.name]))
+        return '\n'.join(lines) + '\n'
+
+
+def remove_snapshots(directory: str):
+    """
+    Remove os retratos gravados pelos workers de uma execução anterior.
+
+    Deve ser chamado pelo processo principal do servidor antes de criar
+    os workers, para que contadores de execuções anteriores (inclusive
+    de PIDs reaproveitados) não sejam somados.
+
+    Args:
+        directory (str): O diretório compartilhado das métricas.
+    """
+    for path in Path(directory).glob('*.json'):
+        path.unlink(missing_ok=True)
+    for path in Path(directory).glob('*.tmp'):
+        path.unlink(missing_ok=True)
+
+
+def is_alive(pid: int) -> bool:
+    """
+    Verifica se um processo ainda está em execução.
+
+    Args:
+        pid (int): O identificador do processo.
+
+    Returns:
+        bool: True se o processo existir, inclusive quando pertence a
+        outro usuário.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # pragma: no cover
+        return True
+    return True
+
+
+registry = Registry()
+
+REQUESTS = registry.register(
+    Counter(
+        'http_requests_total',
+        'Total de requisições HTTP.',
+        ('method', 'route', 'status'),
+    )
+)
+REQUEST_DURATION = registry.register(
+    Histogram(
+        'http_request_duration_seconds',
+        'Duração das requisições HTTP em segundos.',
+        ('method', 'route'),
+    )
+)
+REQUESTS_IN_FLIGHT = registry.register(
+    Gauge('http_requests_in_flight', 'Requisições HTTP em andamento.')
+)
+PASSWORD_HASH_DURATION = registry.register(
+    Histogram(
+        'password_hash_duration_seconds',
+        'Duração da geração e verificação de hashes de senha em segundos.',
+        ('operation',),
+        buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    )
+)
+CACHE_REQUESTS = registry.register(
+    Counter(
+        'cache_requests_total',
+        'Consultas aos caches da aplicação, por resultado (hit ou miss).',
+        ('cache', 'result'),
+    )
+)
+COALESCED_REQUESTS = registry.register(
+    Counter(
+        'http_requests_coalesced_total',
+        'Leituras atendidas pela execução de uma leitura idêntica em '
+        'andamento.',
+        ('route',),
+    )
+)
+SHED_REQUESTS = registry.register(
+    Counter(
+        'http_requests_shed_total',
+        'Requisições rejeitadas com 503 por sobrecarga.',
+        ('route_class', 'reason'),
+    )
+)
+DB_POOL_SIZE = registry.register(
+    Gauge('db_pool_size', 'Tamanho configurado do pool de conexões.')
+)
+DB_POOL_CHECKED_OUT = registry.register(
+    Gauge('db_pool_checked_out', 'Conexões do pool em uso.')
+)
+DB_POOL_OVERFLOW = registry.register(
+    Gauge('db_pool_overflow', 'Conexões abertas além do tamanho do pool.')
+)
+
+
+def pool_collector(engine):
+    """
+    Cria um coletor que lê as estatísticas do pool do engine.
+
+    Apenas pools com tamanho fixo (QueuePool) expõem essas estatísticas;
+    para os demais o coletor não faz nada.
+
+    Args:
+        engine (Engine): O engine cujo pool será observado.
+
+    Returns:
+        Callable: O coletor a ser registrado no registry.
+    """
+
+    def collect():
+        pool = engine.pool
+        if not hasattr(pool, 'checkedout'):
+            return
+        DB_POOL_SIZE.set(pool.size())
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    return collect
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra a contagem, a duração e as requisições
+    em andamento de cada rota.
+
+    A rota é identificada pelo seu modelo (ex.: '/users/{user_id}'),
+    não pelo caminho da requisição, para manter poucas séries.
+
+    Args:
+        app (ASGIApp): A aplicação ASGI.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, scope['method'], route
+            )
+            REQUESTS.inc(scope['method'], route, str(status_code))
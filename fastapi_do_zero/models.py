@@ -1,8 +1,8 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
-from sqlalchemy.orm import Mapped, mapped_column, registry
+from sqlalchemy import ForeignKey, Index, false, func, text
+from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 # Cria uma instância do registry que é utilizada para mapear
 # classes de modelo para tabelas no banco de dados. O registry
@@ -26,16 +26,32 @@ class User:
         username (str): Nome de usuário, deve ser único.
         password (str): Senha do usuário.
         email (str): Endereço de email do usuário, deve ser único.
+        is_admin (bool): Se o usuário tem acesso aos endpoints
+        administrativos. Falso por padrão; não é alterado pela API,
+        apenas diretamente no banco (migração ou seed).
         created_at (datetime): Timestamp da criação do registro,
         definido automaticamente pelo servidor.
+        todos (list[Todo]): Tarefas do usuário. A exclusão das tarefas
+        junto com o usuário é feita pelo banco (ON DELETE CASCADE), por
+        isso `passive_deletes` evita que o ORM carregue as tarefas.
     """
 
     __tablename__ = 'users'
+    # No PostgreSQL, a busca por prefixo de username compara com a
+    # collation "C" (ordem dos code points), que precisa do seu índice
+    __table_args__ = (
+        Index('ix_users_username_c', text('username COLLATE "C"')).ddl_if(
+            dialect='postgresql'
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str]
     email: Mapped[str] = mapped_column(unique=True)
+    is_admin: Mapped[bool] = mapped_column(
+        default=False, server_default=false()
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -46,6 +62,13 @@ class User:
         init=False, server_default=func.now(), onupdate=func.now()
     )
 
+    todos: Mapped[list['Todo']] = relationship(
+        init=False,
+        repr=False,
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+    )
+
 
 class TodoState(str, Enum):
     """
@@ -94,4 +117,6 @@ class Todo:
         init=False, server_default=func.now(), onupdate=func.now()
     )
 
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
@@ -0,0 +1,250 @@
+"""
+Perfilamento sob demanda de requisições em produção.
+
+Uma requisição com o cabeçalho `X-Profile` contendo o token configurado
+é executada com um amostrador de pilhas: uma thread separada lê, a cada
+poucos milissegundos, a pilha de todas as threads com
+`sys._current_frames()`. Isso alcança as rotas síncronas, que rodam no
+pool de threads, o que um perfilador determinístico como o cProfile
+não faz, já que ele acompanha apenas a thread em que foi ativado.
+
+Apenas pilhas que passam pelo código da aplicação são contadas, o que
+descarta as threads ociosas. As pilhas de outras requisições
+executadas ao mesmo tempo também entram no perfil.
+
+O resultado é gravado no formato de pilhas dobradas (uma pilha por
+linha, seguida da quantidade de amostras), lido por ferramentas como
+o flamegraph.pl e o speedscope.
+
+Apenas um perfil é gerado por vez, com um intervalo mínimo entre eles.
+Com o perfilamento desabilitado o middleware não é adicionado à
+aplicação.
+"""
+
+import hmac
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from anyio import to_thread
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre as amostras, em segundos
+SAMPLE_INTERVAL = 0.005
+
+FOLDED_MEDIA_TYPE = b'text/plain; charset=utf-8'
+
+
+class StackSampler:
+    """
+    Amostrador das pilhas de todas as threads do processo.
+
+    Args:
+        modules (tuple[str, ...]): Prefixos dos módulos da aplicação.
+        Apenas pilhas com ao menos uma função desses módulos são
+        contadas.
+        interval (float): Intervalo entre as amostras, em segundos.
+    """
+
+    def __init__(self, modules: tuple[str, ...], interval=SAMPLE_INTERVAL):
+        self.modules = modules
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self.fold(frame)
+                if stack:
+                    self.counts[stack] += 1
+
+    def fold(self, frame) -> str | None:
+        """
+        Converte a pilha de uma thread em uma linha de pilha dobrada.
+
+        Args:
+            frame (FrameType): O quadro no topo da pilha.
+
+        Returns:
+            str | None: As funções, da base ao topo, separadas por ';',
+            ou None se nenhuma for da aplicação.
+        """
+        names = []
+        relevant = False
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '?')
+            relevant = relevant or module.startswith(self.modules)
+            names.append(f'{module}:{frame.f_code.co_qualname}')
+            frame = frame.f_back
+        if not relevant:
+            return None
+        return ';'.join(reversed(names))
+
+    def folded(self) -> str:
+        """
+        Gera o perfil no formato de pilhas dobradas.
+
+        Returns:
+            str: Uma linha por pilha, com a quantidade de amostras.
+        """
+        return ''.join(
+            f'{stack} {count}\n' for stack, count in self.counts.most_common()
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila as requisições autorizadas.
+
+    Args:
+        app (ASGIApp): A aplicação ASGI.
+        token (str): O valor esperado no cabeçalho `X-Profile`.
+        directory (str | None): O diretório onde os perfis são gravados.
+        None retorna o perfil no lugar da resposta da requisição, com
+        o status original no cabeçalho `X-Profiled-Status`.
+        min_interval (float): Intervalo mínimo, em segundos, entre dois
+        perfis.
+
+    Attributes:
+        modules (tuple[str, ...]): Prefixos dos módulos da aplicação,
+        repassados ao StackSampler.
+    """
+
+    modules = ('fastapi_do_zero',)
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str,
+        directory: str | None = None,
+        min_interval: float = 60.0,
+    ):
+        self.app = app
+        self.token = token.encode()
+        self.directory = Path(directory) if directory else None
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.last_profile = float('-inf')
+
+    def authorized(self, scope: Scope) -> bool:
+        header = Headers(scope=scope).get('x-profile')
+        return header is not None and hmac.compare_digest(
+            header.encode(), self.token
+        )
+
+    def acquire(self) -> bool:
+        """
+        Reserva o perfilador, se nenhum perfil estiver em andamento e o
+        intervalo mínimo já tiver passado.
+        """
+        if not self.lock.acquire(blocking=False):
+            return False
+        if time.monotonic() - self.last_profile < self.min_interval:
+            self.lock.release()
+            return False
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope['type'] != 'http'
+            or not self.authorized(scope)
+            or not self.acquire()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.profile(scope, receive, send)
+        finally:
+            self.last_profile = time.monotonic()
+            self.lock.release()
+
+    async def profile(self, scope: Scope, receive: Receive, send: Send):
+        status_code = None
+
+        async def send_or_hold(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            if self.directory:
+                await send(message)
+
+        sampler = StackSampler(self.modules)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_or_hold)
+        finally:
+            # Sinaliza o fim sem bloquear: a thread termina sozinha
+            # mesmo se a requisição for cancelada ou falhar
+            sampler.stopped.set()
+        # A espera pela thread e a gravação do perfil rodam fora do
+        # loop de eventos
+        await to_thread.run_sync(sampler.stop)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        folded = sampler.folded()
+        logger.info(
+            'Profiled %s %s: %d samples in %.1f ms',
+            scope['method'],
+            scope['path'],
+            sampler.samples,
+            elapsed_ms,
+        )
+
+        if self.directory:
+            await to_thread.run_sync(self.write, scope, folded)
+            return
+
+        body = folded.encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', FOLDED_MEDIA_TYPE),
+                (b'content-length', str(len(body)).encode()),
+                (b'x-profiled-status', str(status_code).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def write(self, scope: Scope, folded: str) -> Path:
+        """
+        Grava o perfil no diretório configurado.
+
+        Returns:
+            Path: O arquivo gravado, nomeado com o horário, o método e
+            o caminho da requisição.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now(tz=ZoneInfo('UTC')).strftime(
+            '%Y%m%dT%H%M%S%f'
+        )
+        path = re.sub(r'[^\w]+', '_', scope['path']).strip('_') or 'root'
+        file = self.directory / f'{timestamp}-{scope["method"]}-{path}.folded'
+        file.write_text(folded)
+        logger.info('Profile written to %s', file)
+        return file
@@ -0,0 +1,277 @@
+"""
+Classes de resposta e negociação de conteúdo da API.
+
+Além de JSON, as rotas que usam `NegotiatedRoute` aceitam MessagePack,
+tanto no corpo da requisição (`Content-Type: application/msgpack`)
+quanto na resposta (`Accept: application/msgpack`). Em MessagePack os
+valores seguem a mesma representação do JSON:
+
+- datetime: string ISO 8601, ex.: '2024-07-31T19:19:16';
+- TodoState: o valor do enum como string, ex.: 'draft';
+- EmailStr: string.
+
+Erros (HTTPException e erros de validação) continuam sendo
+retornados em JSON.
+"""
+
+from http import HTTPStatus
+
+import msgpack
+import orjson
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from fastapi_do_zero.instrumentation import timed
+from fastapi_do_zero.settings import get_settings
+from fastapi_do_zero.single_flight import SingleFlight, request_key
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, 'application/x-msgpack'}
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    """
+    Resposta JSON padrão da aplicação, com o tempo de serialização medido.
+
+    É usada pelo FastAPI para as rotas que retornam o conteúdo e deixam
+    a conversão para o `response_model`. O tempo de geração do JSON é
+    somado em `serialize_time`; a validação do conteúdo no
+    `response_model`, feita antes pelo FastAPI, não é medida.
+    """
+
+    def render(self, content) -> bytes:
+        with timed('serialize_time'):
+            return super().render(content)
+
+
+class SchemaResponse(Response):
+    """
+    Resposta JSON serializada diretamente a partir de um schema.
+
+    Quando a rota declara `response_model`, o FastAPI valida o retorno,
+    converte o resultado em dicionários e só então gera o JSON. Esta
+    resposta valida o conteúdo no schema e gera os bytes do JSON em uma
+    única etapa, pelo núcleo em Rust do Pydantic. A rota deve continuar
+    declarando `response_model` para a documentação da API.
+
+    Args:
+        model (type[BaseModel]): O schema usado para validar e
+        serializar o conteúdo.
+        content: O conteúdo da resposta, como um dicionário ou um
+        objeto do ORM.
+        exclude_unset (bool): Se verdadeiro, omite os campos que não
+        foram definidos no conteúdo.
+        status_code (int): O código de status HTTP da resposta.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        content,
+        *,
+        exclude_unset: bool = False,
+        status_code: int = HTTPStatus.OK,
+    ):
+        with timed('serialize_time'):
+            self.instance = model.model_validate(content, from_attributes=True)
+            body = self.instance.model_dump_json(exclude_unset=exclude_unset)
+        self.exclude_unset = exclude_unset
+        super().__init__(body, status_code=status_code)
+
+    def to_python(self):
+        """
+        Retorna o conteúdo da resposta com os tipos do JSON.
+
+        Returns:
+            dict: O conteúdo serializado, sem passar pelos bytes do JSON.
+        """
+        return self.instance.model_dump(
+            mode='json', exclude_unset=self.exclude_unset
+        )
+
+
+def media_type_of(header: str | None) -> str:
+    """
+    Extrai o tipo de mídia de um cabeçalho, sem os parâmetros.
+
+    Args:
+        header (str | None): O valor do cabeçalho, ex.:
+        'application/json; charset=utf-8'.
+
+    Returns:
+        str: O tipo de mídia em minúsculas, ex.: 'application/json'.
+    """
+    return (header or '').split(';')[0].strip().lower()
+
+
+def header_qualities(header: str) -> dict[str, float]:
+    """
+    Interpreta um cabeçalho de negociação com fatores de qualidade.
+
+    Args:
+        header (str): O valor do cabeçalho, ex.: Accept ou
+        Accept-Encoding.
+
+    Returns:
+        dict[str, float]: A qualidade (q) de cada valor, em minúsculas.
+    """
+    qualities = {}
+    for item in header.split(','):
+        value, *params = item.split(';')
+        q = 1.0
+        for param in params:
+            name, _, raw = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        qualities[value.strip().lower()] = q
+    return qualities
+
+
+def prefers_msgpack(accept: str | None) -> bool:
+    """
+    Verifica se o cabeçalho Accept prefere MessagePack a JSON.
+
+    Args:
+        accept (str | None): O valor do cabeçalho Accept.
+
+    Returns:
+        bool: True se MessagePack tiver qualidade maior que zero e
+        não menor que a de JSON.
+    """
+    if not accept:
+        return False
+
+    quality = header_qualities(accept)
+    msgpack_q = max(quality.get(t, 0.0) for t in MSGPACK_MEDIA_TYPES)
+    json_q = max(quality.get(JSON_MEDIA_TYPE, 0.0), quality.get('*/*', 0.0))
+
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+async def msgpack_to_json_request(request: Request) -> Request:
+    """
+    Converte uma requisição com corpo MessagePack em uma requisição JSON.
+
+    O FastAPI só interpreta corpos JSON, então o corpo é decodificado e
+    entregue à rota como JSON, com o mesmo schema de validação.
+
+    Args:
+        request (Request): A requisição original.
+
+    Raises:
+        HTTPException: Se o corpo não for um MessagePack válido ou tiver
+        valores que não podem ser representados em JSON.
+
+    Returns:
+        Request: Uma nova requisição com o corpo em JSON.
+    """
+    try:
+        data = msgpack.unpackb(await request.body(), raw=False)
+        # Valores sem equivalente em JSON (bin, ext, timestamp ou chaves
+        # que não são texto) fazem o orjson levantar TypeError
+        body = orjson.dumps(data)
+    except (ValueError, TypeError, msgpack.UnpackException):
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='Invalid msgpack body'
+        )
+
+    scope = dict(request.scope)
+    scope['headers'] = [
+        (name, value)
+        for name, value in request.scope['headers']
+        if name != b'content-type'
+    ] + [(b'content-type', JSON_MEDIA_TYPE.encode())]
+
+    json_request = Request(scope, request.receive)
+    json_request._body = body
+    return json_request
+
+
+def to_msgpack(response: Response) -> Response:
+    """
+    Reescreve uma resposta JSON em MessagePack.
+
+    Respostas `SchemaResponse` são convertidas a partir do schema
+    validado; as demais têm o corpo JSON decodificado antes. O tempo
+    da conversão é somado em `serialize_time`.
+
+    Args:
+        response (Response): A resposta JSON gerada pela rota.
+
+    Returns:
+        Response: A resposta em MessagePack.
+    """
+    with timed('serialize_time'):
+        if isinstance(response, SchemaResponse):
+            content = response.to_python()
+        else:
+            content = orjson.loads(response.body)
+        body = msgpack.packb(content)
+
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in {'content-length', 'content-type'}
+    }
+    return Response(
+        body,
+        status_code=response.status_code,
+        headers=headers,
+        media_type=MSGPACK_MEDIA_TYPE,
+        background=response.background,
+    )
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Rota que negocia o formato do corpo e da resposta.
+
+    Aceita corpos em JSON ou MessagePack e responde em MessagePack
+    quando o cliente o prefere no cabeçalho Accept. As rotas marcadas
+    com `single_flight.coalesce` agrupam as leituras idênticas e
+    simultâneas em uma única execução, se SINGLE_FLIGHT_ENABLED estiver
+    habilitado.
+    """
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def negotiated_route_handler(request: Request) -> Response:
+            content_type = media_type_of(request.headers.get('content-type'))
+            if content_type in MSGPACK_MEDIA_TYPES:
+                request = await msgpack_to_json_request(request)
+
+            response = await route_handler(request)
+
+            is_json = (
+                media_type_of(response.headers.get('content-type'))
+                == JSON_MEDIA_TYPE
+            )
+            if is_json and prefers_msgpack(request.headers.get('accept')):
+                response = to_msgpack(response)
+
+            response.headers['Vary'] = 'Accept'
+            return response
+
+        if not getattr(self.endpoint, 'single_flight', False):
+            return negotiated_route_handler
+
+        flight = SingleFlight(self.path)
+
+        async def coalesced_route_handler(request: Request) -> Response:
+            if not get_settings().SINGLE_FLIGHT_ENABLED:
+                return await negotiated_route_handler(request)
+            return await flight.do(
+                request_key(request),
+                lambda: negotiated_route_handler(request),
+            )
+
+        return coalesced_route_handler
@@ -0,0 +1,29 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from fastapi_do_zero.models import User
+from fastapi_do_zero.schemas import SlowQueryList
+from fastapi_do_zero.security import get_current_admin
+from fastapi_do_zero.slow_queries import recorder
+
+router = APIRouter(prefix='/admin', tags=['admin'])
+
+T_CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+
+
+@router.get('/slow-queries', response_model=SlowQueryList)
+def read_slow_queries(current_user: T_CurrentAdmin):
+    """
+    Endpoint para listar as últimas consultas lentas registradas.
+
+    Apenas administradores podem acessar este endpoint. As consultas
+    só são registradas com `SLOW_QUERY_LOG_ENABLED` habilitado.
+
+    Args:
+        current_user (User): O administrador autenticado.
+
+    Returns:
+        dict: As consultas lentas, da mais recente à mais antiga.
+    """
+    return {'queries': recorder.recent()}
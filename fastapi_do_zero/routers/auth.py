@@ -5,7 +5,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from fastapi_do_zero.database import get_session
+from fastapi_do_zero.database import get_read_session
 from fastapi_do_zero.models import User
 from fastapi_do_zero.schemas import Token
 from fastapi_do_zero.security import (
@@ -16,12 +16,12 @@ from fastapi_do_zero.security import (
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_ReadSession = Annotated[Session, Depends(get_read_session)]
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 
 @router.post('/token')
-def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
+def login_for_access_token(session: T_ReadSession, form_data: T_OAuth2Form):
     """
     Endpoint para login e obtenção de token de acesso.
 
@@ -32,7 +32,7 @@ def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
     Args:
         form_data (OAuth2PasswordRequestForm): Os dados do formulário
         de login, contendo o nome de usuário e a senha.
-        session (Session): A sessão de banco de dados a ser utilizada.
+        session (Session): A sessão somente leitura a ser utilizada.
 
     Raises:
         HTTPException: Se o nome de usuário ou a senha estiverem
@@ -46,6 +46,8 @@ def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
     user = session.scalar(
         select(User).where(User.username == form_data.username)
     )
+    # Devolve a conexão ao pool antes da verificação da senha, que é lenta
+    session.close()
     # Verifica se o usuário existe e se a senha está correta
     if not user or not verify_password(form_data.password, user.password):
         raise HTTPException(
@@ -0,0 +1,176 @@
+import time
+from http import HTTPStatus
+from pathlib import Path
+from threading import Lock
+
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool
+
+from fastapi_do_zero.database import get_engine
+from fastapi_do_zero.metrics import CACHE_REQUESTS
+from fastapi_do_zero.schemas import Health, Readiness
+from fastapi_do_zero.settings import get_settings
+
+router = APIRouter(tags=['health'])
+
+
+class DatabaseHealth:
+    """
+    Resultado do ping ao banco, reaproveitado por um intervalo curto.
+
+    Sondas frequentes de vários balanceadores recebem o resultado em
+    cache; apenas uma sonda por intervalo chega ao banco. Enquanto um
+    ping está em andamento, as demais sondas não esperam por ele: elas
+    recebem o último resultado, mesmo que expirado, para que um banco
+    travado não prenda uma thread do pool por sonda.
+
+    Args:
+        ttl (float | None): Por quantos segundos o resultado é
+        reaproveitado. None usa `HEALTH_CACHE_SECONDS`, lido apenas na
+        primeira verificação.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self.healthy = False
+        self.checked_at = float('-inf')
+        self.lock = Lock()
+
+    def fresh(self) -> bool:
+        if self.ttl is None:
+            self.ttl = get_settings().HEALTH_CACHE_SECONDS
+        return time.monotonic() - self.checked_at < self.ttl
+
+    def check(self) -> bool:
+        """
+        Retorna o resultado em cache ou faz um novo ping.
+
+        Returns:
+            bool: True se o banco respondeu. Antes do primeiro ping,
+            enquanto ele está em andamento, retorna False.
+        """
+        if self.fresh():
+            CACHE_REQUESTS.inc('db_health', 'hit')
+            return self.healthy
+
+        if not self.lock.acquire(blocking=False):
+            CACHE_REQUESTS.inc('db_health', 'stale')
+            return self.healthy
+
+        try:
+            # Outra thread pode ter terminado um ping antes desta travar
+            if not self.fresh():
+                CACHE_REQUESTS.inc('db_health', 'miss')
+                self.healthy = ping()
+                self.checked_at = time.monotonic()
+            return self.healthy
+        finally:
+            self.lock.release()
+
+
+def ping() -> bool:
+    """Executa `SELECT 1` em uma conexão do pool."""
+    try:
+        with get_engine().connect() as connection:
+            connection.execute(text('SELECT 1'))
+    except SQLAlchemyError:
+        return False
+    return True
+
+
+def pool_available() -> bool:
+    """
+    Verifica se o pool de conexões ainda tem conexões livres.
+
+    O limite é o tamanho do pool somado a `DB_MAX_OVERFLOW`, o mesmo
+    usado na criação do engine. Pools sem limite de tamanho (como os
+    do SQLite em memória) estão sempre disponíveis.
+
+    Returns:
+        bool: False se todas as conexões, inclusive as de overflow,
+        estiverem em uso.
+    """
+    pool = get_engine().pool
+    max_overflow = get_settings().DB_MAX_OVERFLOW
+    if not isinstance(pool, QueuePool) or max_overflow < 0:
+        return True
+    return pool.checkedout() < pool.size() + max_overflow
+
+
+def draining(request: Request) -> bool:
+    """
+    Verifica se a instância está sendo retirada do balanceador.
+
+    A instância drena durante o desligamento da aplicação ou enquanto
+    existir o arquivo `DRAIN_FILE`, o que vale para todos os workers.
+    """
+    drain_file = get_settings().DRAIN_FILE
+    return getattr(request.app.state, 'draining', False) or bool(
+        drain_file and Path(drain_file).exists()
+    )
+
+
+database_health = DatabaseHealth()
+
+
+@router.get('/healthz', response_model=Health)
+async def liveness():
+    """
+    Endpoint de liveness: indica apenas que o processo responde.
+
+    É assíncrono e não faz I/O, então responde mesmo com o pool de
+    threads ou o banco sobrecarregados.
+
+    Returns:
+        dict: O status 'ok'.
+    """
+    return {'status': 'ok'}
+
+
+@router.get(
+    '/readyz',
+    response_model=Readiness,
+    responses={HTTPStatus.SERVICE_UNAVAILABLE: {'model': Readiness}},
+)
+async def readiness(request: Request):
+    """
+    Endpoint de readiness: indica se a instância pode receber tráfego.
+
+    Verifica se o aquecimento terminou, se a instância não está
+    drenando, se o banco responde (com o resultado em cache por
+    `HEALTH_CACHE_SECONDS`) e se o pool ainda tem conexões livres.
+
+    Args:
+        request (Request): A requisição, para acessar o estado da
+        aplicação.
+
+    Returns:
+        ORJSONResponse: O resultado de cada verificação, com status
+        200 (OK) ou 503 (Service Unavailable).
+    """
+    # O ping só vai para o pool de threads quando o cache expirou
+    if database_health.fresh():
+        database = database_health.check()
+    else:
+        database = await run_in_threadpool(database_health.check)
+
+    checks = {
+        'warmup': getattr(request.app.state, 'ready', False),
+        'draining': draining(request),
+        'database': database,
+        'pool': pool_available(),
+    }
+    ready = (
+        checks['warmup']
+        and not checks['draining']
+        and checks['database']
+        and checks['pool']
+    )
+    return ORJSONResponse(
+        {'status': 'ready' if ready else 'not ready', 'checks': checks},
+        status_code=HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE,
+    )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fastapi_do_zero.metrics import registry
+
+router = APIRouter(tags=['metrics'])
+
+PROMETHEUS_MEDIA_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@router.get('/metrics', include_in_schema=False)
+def read_metrics():
+    """
+    Endpoint que expõe as métricas da aplicação para o Prometheus.
+
+    Com `METRICS_DIR` configurado, as métricas são a soma de todos os
+    workers que gravam no diretório.
+
+    Returns:
+        PlainTextResponse: As métricas no formato de texto do
+        Prometheus.
+    """
+    registry.flush()
+    return PlainTextResponse(
+        registry.render(), media_type=PROMETHEUS_MEDIA_TYPE
+    )
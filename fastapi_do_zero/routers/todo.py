@@ -5,8 +5,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from fastapi_do_zero.database import get_session
+from fastapi_do_zero.database import (
+    get_read_session,
+    get_session,
+    rows_with_total,
+)
 from fastapi_do_zero.models import Todo, User
+from fastapi_do_zero.responses import NegotiatedRoute, SchemaResponse
 from fastapi_do_zero.schemas import (
     Message,
     TodoList,
@@ -15,12 +20,28 @@ from fastapi_do_zero.schemas import (
     TodoUpdate,
 )
 from fastapi_do_zero.security import get_current_user
+from fastapi_do_zero.single_flight import coalesce
 
-router = APIRouter(prefix='/todos', tags=['todos'])
+router = APIRouter(
+    prefix='/todos', tags=['todos'], route_class=NegotiatedRoute
+)
 
 T_Session = Annotated[Session, Depends(get_session)]
+T_ReadSession = Annotated[Session, Depends(get_read_session)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Colunas expostas em TodoPublic. As leituras selecionam apenas estas
+# colunas, recebendo linhas leves em vez de objetos do ORM, que não
+# passam pelo identity map da sessão.
+TODO_PUBLIC_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.description,
+    Todo.state,
+    Todo.created_at,
+    Todo.updated_at,
+)
+
 
 @router.post('/', response_model=TodoPublic)
 def create_todo(todo: TodoSchema, session: T_Session, user: CurrentUser):
@@ -54,15 +75,17 @@ def create_todo(todo: TodoSchema, session: T_Session, user: CurrentUser):
     return db_todo
 
 
-@router.get('/', response_model=TodoList)
+@router.get('/', response_model=TodoList, response_model_exclude_unset=True)
+@coalesce
 def list_todos(  # noqa
-    session: T_Session,
+    session: T_ReadSession,
     user: CurrentUser,
     title: str | None = None,
     description: str | None = None,
     state: str | None = None,
     offset: int | None = None,
     limit: int | None = None,
+    include_total: bool = False,
 ):
     """
     Endpoint para listar tarefas.
@@ -71,19 +94,21 @@ def list_todos(  # noqa
     Os resultados podem ser paginados utilizando os parâmetros offset e limit.
 
     Args:
-        session (Session): Sessão de banco de dados.
+        session (Session): Sessão somente leitura de banco de dados.
         user (User): Usuário autenticado.
         title (str, optional): Filtro pelo título da tarefa.
         description (str, optional): Filtro pela descrição da tarefa.
         state (str, optional): Filtro pelo estado da tarefa.
         offset (int, optional): Número de tarefas a pular (para paginação).
         limit (int, optional): Número máximo de tarefas a retornar.
+        include_total (bool, optional): Se verdadeiro, inclui o total de
+        tarefas que correspondem aos filtros, calculado na mesma consulta.
 
     Returns:
         TodoList: Uma lista de tarefas que correspondem aos filtros aplicados.
     """
 
-    query = select(Todo).where(Todo.user_id == user.id)
+    query = select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == user.id)
 
     if title:
         query = query.filter(Todo.title.contains(title))
@@ -94,9 +119,17 @@ def list_todos(  # noqa
     if state:
         query = query.filter(Todo.state == state)
 
-    todos = session.scalars(query.offset(offset).limit(limit)).all()
+    query = query.offset(offset).limit(limit)
+
+    if include_total:
+        todos, total = rows_with_total(session, query)
+        return SchemaResponse(
+            TodoList, {'todos': todos, 'total': total}, exclude_unset=True
+        )
+
+    todos = session.execute(query).all()
 
-    return {'todos': todos}
+    return SchemaResponse(TodoList, {'todos': todos}, exclude_unset=True)
 
 
 @router.delete('/{todo_id}', response_model=Message)
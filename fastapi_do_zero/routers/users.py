@@ -1,44 +1,297 @@
+import sys
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from fastapi_do_zero.database import get_session
+from fastapi_do_zero.database import (
+    get_read_session,
+    get_session,
+    rows_with_total,
+)
 from fastapi_do_zero.models import User
-from fastapi_do_zero.schemas import Message, UserList, UserPublic, UserSchema
-from fastapi_do_zero.security import get_current_user, get_password_hash
-
-router = APIRouter(prefix='/users', tags=['users'])
+from fastapi_do_zero.responses import NegotiatedRoute, SchemaResponse
+from fastapi_do_zero.schemas import (
+    Message,
+    UserBulkList,
+    UserList,
+    UserPatch,
+    UserPublic,
+    UserSchema,
+    UserUpdate,
+)
+from fastapi_do_zero.security import (
+    get_current_admin,
+    get_current_user,
+    get_password_hash,
+    get_password_hashes,
+    verify_password,
+)
+from fastapi_do_zero.single_flight import coalesce
+
+router = APIRouter(
+    prefix='/users', tags=['users'], route_class=NegotiatedRoute
+)
 
 T_Session = Annotated[Session, Depends(get_session)]
+T_ReadSession = Annotated[Session, Depends(get_read_session)]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+
+# Colunas expostas em UserPublic. As leituras selecionam apenas estas
+# colunas, recebendo linhas leves em vez de objetos do ORM, que não
+# passam pelo identity map da sessão.
+USER_PUBLIC_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.created_at,
+    User.updated_at,
+)
+
+# Quantidade máxima de usuários retornados por página
+MAX_PAGE_SIZE = 100
+
+# Quantidade máxima de usuários por requisição de criação em lote
+MAX_BULK_SIZE = 1000
+
+# Código SQLSTATE do PostgreSQL para violações de unicidade
+UNIQUE_VIOLATION_SQLSTATE = '23505'
+
+# Mensagens das violações de unicidade, por coluna
+UNIQUE_VIOLATION_DETAILS = {
+    'username': 'Usuário já existente',
+    'email': 'E-mail já existente',
+}
+
+# Faixa dos substitutos (surrogates) UTF-16, que não formam textos
+# válidos
+SURROGATES_START = 0xD800
+SURROGATES_END = 0xDFFF
+
+
+def unique_violation_detail(error: IntegrityError) -> str | None:
+    """
+    Traduz uma violação de unicidade da tabela de usuários na mensagem
+    de erro retornada pela API.
+
+    No PostgreSQL o código do erro e o nome da restrição são obtidos do
+    diagnóstico do driver (ex.: `users_email_key`); no SQLite a
+    mensagem informa o tipo da restrição e a coluna (ex.: `UNIQUE
+    constraint failed: users.email`). Outras violações, como chaves
+    estrangeiras ou campos obrigatórios, não são traduzidas.
+
+    Args:
+        error (IntegrityError): O erro levantado pelo banco de dados.
+
+    Returns:
+        str | None: 'E-mail já existente' ou 'Usuário já existente', ou
+        None se o erro não for uma violação de unicidade de username ou
+        e-mail.
+    """
+    diag = getattr(error.orig, 'diag', None)
+    if diag is not None:
+        if getattr(diag, 'sqlstate', None) != UNIQUE_VIOLATION_SQLSTATE:
+            return None
+        constraint = diag.constraint_name
+    else:
+        constraint = str(error.orig)
+
+    for column, detail in UNIQUE_VIOLATION_DETAILS.items():
+        if constraint in {
+            f'users_{column}_key',
+            f'UNIQUE constraint failed: users.{column}',
+        }:
+            return detail
+
+    return None
 
 
-@router.get('/', response_model=UserList)
-def read_users(session: T_Session, limit: int = 10, skip: int = 0):
+def prefix_upper_bound(prefix: str) -> str | None:
+    """
+    Calcula o menor texto maior que todos os que começam com o prefixo.
+
+    O último caractere é trocado pelo seguinte. Caracteres U+10FFFF no
+    final não têm sucessor e são removidos, e os substitutos (U+D800 a
+    U+DFFF), que não podem ser codificados, são pulados.
+
+    Args:
+        prefix (str): O prefixo buscado.
+
+    Returns:
+        str | None: O limite superior exclusivo, ou None se não houver
+        limite (o prefixo só tem caracteres U+10FFFF).
+    """
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+
+    following = ord(prefix[-1]) + 1
+    if SURROGATES_START <= following <= SURROGATES_END:
+        following = SURROGATES_END + 1
+
+    return prefix[:-1] + chr(following)
+
+
+def username_prefix_filters(prefix: str, dialect: str) -> list:
+    """
+    Monta os filtros da busca de usuários por prefixo do username.
+
+    O `startswith` garante a semântica exata de prefixo. O intervalo
+    `prefix <= username < prefix_upper_bound(prefix)` permite usar um
+    índice, mas só equivale ao prefixo quando a comparação segue a ordem
+    dos code points: no PostgreSQL ela é feita com a collation "C", pois
+    outras (ex.: en_US.UTF-8) ignoram a pontuação na primeira comparação
+    e o intervalo descartaria usuários; no SQLite a collation padrão
+    (BINARY) já segue essa ordem. Nos demais bancos o intervalo não é
+    aplicado.
+
+    Args:
+        prefix (str): O prefixo buscado.
+        dialect (str): O nome do dialeto do banco de dados.
+
+    Returns:
+        list: As condições a serem aplicadas na consulta.
+    """
+    filters = [User.username.startswith(prefix, autoescape=True)]
+
+    if dialect == 'postgresql':
+        username = User.username.collate('C')
+    elif dialect == 'sqlite':
+        username = User.username
+    else:
+        return filters
+
+    filters.append(username >= prefix)
+    upper_bound = prefix_upper_bound(prefix)
+    if upper_bound is not None:
+        filters.append(username < upper_bound)
+
+    return filters
+
+
+def password_values(current_user: User, password: str | None) -> dict:
+    """
+    Retorna a coluna de senha a ser atualizada, se houver.
+
+    A senha informada é comparada com o hash armazenado, assim uma
+    senha inalterada não gera um novo hash nem uma escrita no banco.
+
+    Args:
+        current_user (User): O usuário atualmente autenticado.
+        password (str | None): A senha enviada na requisição.
+
+    Returns:
+        dict: `{'password': <novo hash>}` se a senha mudou, senão vazio.
+    """
+    if password is None or verify_password(password, current_user.password):
+        return {}
+
+    return {'password': get_password_hash(password)}
+
+
+def update_user_columns(session: Session, user_id: int, values: dict):
+    """
+    Atualiza as colunas informadas de um usuário com um único UPDATE.
+
+    Args:
+        session (Session): A sessão de banco de dados a ser utilizada.
+        user_id (int): O ID do usuário a ser atualizado.
+        values (dict): As colunas e seus novos valores.
+
+    Raises:
+        HTTPException: Se o novo nome de usuário ou e-mail já existirem.
+        IntegrityError: Se o banco rejeitar os valores por outro motivo.
+
+    Returns:
+        Row: As informações públicas do usuário atualizado.
+    """
+    try:
+        db_user = session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(*USER_PUBLIC_COLUMNS)
+        ).one()
+        session.commit()
+    except IntegrityError as error:
+        session.rollback()
+        detail = unique_violation_detail(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=detail)
+
+    return db_user
+
+
+@router.get('/', response_model=UserList, response_model_exclude_unset=True)
+def read_users(  # noqa
+    session: T_ReadSession,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 10,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    after: int | None = None,
+    username: str | None = None,
+    include_total: bool = False,
+):
     """
     Endpoint para listar todos os usuários.
 
-    Este endpoint retorna uma lista de todos os usuários cadastrados.
-    O código de status HTTP retornado é 200 (OK).
+    Este endpoint retorna uma lista de todos os usuários cadastrados,
+    ordenados pelo ID. A paginação pode ser feita por cursor (`after`),
+    que usa a chave primária e não precisa percorrer os registros
+    anteriores, ou por deslocamento (`skip`). O código de status HTTP
+    retornado é 200 (OK).
 
     Args:
         session (Session): A sessão de banco de dados a ser utilizada.
-        limit (int): Número máximo de usuários a serem retornados.
+        limit (int): Número máximo de usuários a serem retornados,
+        limitado a MAX_PAGE_SIZE.
         skip (int): Número de usuários a serem ignorados.
+        after (int, optional): Cursor da paginação. Retorna apenas os
+        usuários com ID maior que o informado, normalmente o
+        `next_cursor` da página anterior.
+        username (str, optional): Prefixo do nome de usuário a ser
+        buscado.
+        include_total (bool): Se verdadeiro, inclui o total de usuários
+        que correspondem aos filtros, calculado na mesma consulta.
+        Com `after`, o total considera apenas os usuários após o cursor.
 
     Returns:
-        UserList: Um objeto contendo uma lista de usuários.
+        UserList: Um objeto contendo uma lista de usuários e, quando
+        a página está cheia, o `next_cursor` para a próxima página.
         De acordo com o esquema definido em UserList.
     """
-    user = session.scalars(select(User).limit(limit).offset(skip))
-    return {'users': user}
+    query = select(*USER_PUBLIC_COLUMNS).order_by(User.id)
+
+    if after is not None:
+        query = query.where(User.id > after)
+
+    if username:
+        query = query.where(
+            *username_prefix_filters(username, session.get_bind().dialect.name)
+        )
+
+    query = query.limit(limit).offset(skip)
+
+    if include_total:
+        users, total = rows_with_total(session, query)
+        response = {'users': users, 'total': total}
+    else:
+        users = session.execute(query).all()
+        response = {'users': users}
+
+    if len(users) == limit:
+        response['next_cursor'] = users[-1].id
+
+    return SchemaResponse(UserList, response, exclude_unset=True)
 
 
 @router.get('/{user_id}', response_model=UserPublic)
-def read_user(user_id: int, session: T_Session):
+@coalesce
+def read_user(user_id: int, session: T_ReadSession):
     """
     Endpoint para ler os dados de um usuário específico.
 
@@ -64,19 +317,21 @@ def read_user(user_id: int, session: T_Session):
     Exercício aula 5 - Implementar o banco de dados para o endpoint
     de listagem por id, criado no exercício 3 da aula 03.
     """
-    db_user = session.scalar(select(User).where(User.id == user_id))
+    db_user = session.execute(
+        select(*USER_PUBLIC_COLUMNS).where(User.id == user_id)
+    ).first()
     if not db_user:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Usuário não existe'
         )
 
-    return db_user
+    return SchemaResponse(UserPublic, db_user)
 
 
 @router.put('/{user_id}', response_model=UserPublic)
 def update_user(
     user_id: int,
-    user: UserSchema,
+    user: UserUpdate,
     session: T_Session,
     current_user: T_CurrentUser,
 ):
@@ -85,20 +340,22 @@ def update_user(
 
     Este endpoint recebe os dados atualizados de um usuário e retorna
     as informações públicas do usuário atualizado. Os dados do usuário
-    são validados de acordo com o esquema definido em UserSchema.
-    O código de status HTTP retornado é 200 (OK).
+    são validados de acordo com o esquema definido em UserUpdate.
+    A senha é opcional e só gera um novo hash quando for diferente da
+    atual. O código de status HTTP retornado é 200 (OK).
 
     Args:
         user_id (int): O ID do usuário a ser atualizado.
-        user (UserSchema): Um objeto contendo os dados atualizados
+        user (UserUpdate): Um objeto contendo os dados atualizados
         do usuário.
         session (Session): A sessão de banco de dados a ser utilizada.
         current_user (User): O usuário atualmente autenticado, obtido
         a partir do token de autenticação.
 
     Raises:
-        HTTPException: Se o usuário não existir ou se o usuário
-        autenticado não tiver permissão.
+        HTTPException: Se o usuário não existir, se o usuário
+        autenticado não tiver permissão ou se o novo nome de usuário
+        ou e-mail já existirem.
 
     Returns:
         UserPublic: Um objeto contendo as informações públicas do
@@ -110,14 +367,54 @@ def update_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
         )
 
-    current_user.username = user.username
-    current_user.email = user.email
-    current_user.password = get_password_hash(user.password)
+    values = user.model_dump(exclude={'password'})
+    values.update(password_values(current_user, user.password))
 
-    session.commit()
-    session.refresh(current_user)
+    return update_user_columns(session, user_id, values)
+
+
+@router.patch('/{user_id}', response_model=UserPublic)
+def patch_user(
+    user_id: int,
+    user: UserPatch,
+    session: T_Session,
+    current_user: T_CurrentUser,
+):
+    """
+    Endpoint para atualizar parcialmente um usuário.
+
+    Apenas os campos fornecidos no corpo da requisição são atualizados,
+    com uma única instrução UPDATE. O código de status HTTP retornado
+    é 200 (OK).
+
+    Args:
+        user_id (int): O ID do usuário a ser atualizado.
+        user (UserPatch): Os campos do usuário a serem atualizados.
+        session (Session): A sessão de banco de dados a ser utilizada.
+        current_user (User): O usuário atualmente autenticado, obtido
+        a partir do token de autenticação.
+
+    Raises:
+        HTTPException: Se o usuário autenticado não tiver permissão
+        ou se o novo nome de usuário ou e-mail já existirem.
+
+    Returns:
+        UserPublic: As informações públicas do usuário atualizado.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
+        )
+
+    values = user.model_dump(
+        exclude_unset=True, exclude_none=True, exclude={'password'}
+    )
+    values.update(password_values(current_user, user.password))
 
-    return current_user
+    if not values:
+        return current_user
+
+    return update_user_columns(session, user_id, values)
 
 
 @router.delete('/{user_id}', response_model=Message)
@@ -147,7 +444,9 @@ def delete_user(user_id: int, session: T_Session, current_user: T_CurrentUser):
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
         )
 
-    session.delete(current_user)
+    # O usuário autenticado foi carregado pela sessão de leitura, então a
+    # exclusão é feita por instrução; as tarefas são removidas pelo banco
+    session.execute(delete(User).where(User.id == user_id))
     session.commit()
 
     return {'message': 'Usuário deletado'}
@@ -168,38 +467,168 @@ def create_user(user: UserSchema, session: T_Session):
         session (Session): A sessão de banco de dados a ser utilizada.
 
     Raises:
-        HTTPException: Se o usuário ou e-mail já existirem.
+        HTTPException: Se o usuário ou e-mail já existirem. A
+        verificação é feita pelas restrições de unicidade do banco,
+        em uma única ida ao banco de dados.
 
     Returns:
         UserPublic: Um objeto contendo as informações públicas do
         usuário. De acordo com o esquema definido em UserPublic.
     """
-    db_user = session.scalar(
-        select(User).where(
-            (User.username == user.username) | (User.email == user.email)
-        )
-    )
-
-    if db_user:
-        if db_user.username == user.username:
-            raise HTTPException(
-                status_code=HTTPStatus.BAD_REQUEST,
-                detail='Usuário já existente',
-            )
-        elif db_user.email == user.email:
-            raise HTTPException(
-                status_code=HTTPStatus.BAD_REQUEST,
-                detail='E-mail já existente',
-            )
+    # O hash é gerado antes de abrir a transação para que o tempo de
+    # escrita no banco seja o menor possível
+    hashed_password = get_password_hash(user.password)
 
     db_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=hashed_password,
     )
 
     session.add(db_user)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError as error:
+        session.rollback()
+        detail = unique_violation_detail(error)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=detail)
     session.refresh(db_user)
 
     return db_user
+
+
+def bulk_conflicts(
+    session: Session, users: list[UserSchema]
+) -> tuple[list, list[int]]:
+    """
+    Verifica os conflitos de um lote de usuários com uma única consulta.
+
+    Um usuário conflita se o nome ou o e-mail já existirem no banco ou
+    em um usuário anterior do próprio lote.
+
+    Args:
+        session (Session): A sessão de banco de dados a ser utilizada.
+        users (list[UserSchema]): Os usuários do lote.
+
+    Returns:
+        tuple[list, list[int]]: O resultado de cada usuário, preenchido
+        apenas para os conflitos (os demais são None), e os índices dos
+        usuários que podem ser criados.
+    """
+    usernames = {user.username for user in users}
+    emails = {user.email for user in users}
+
+    existing = session.execute(
+        select(User.username, User.email).where(
+            User.username.in_(usernames) | User.email.in_(emails)
+        )
+    ).all()
+    taken_usernames = {row.username for row in existing}
+    taken_emails = {row.email for row in existing}
+
+    results = [None] * len(users)
+    valid = []
+    for index, user in enumerate(users):
+        if user.username in taken_usernames:
+            detail = 'Usuário já existente'
+        elif user.email in taken_emails:
+            detail = 'E-mail já existente'
+        else:
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            valid.append(index)
+            continue
+
+        results[index] = {
+            'index': index,
+            'status': HTTPStatus.BAD_REQUEST,
+            'detail': detail,
+        }
+
+    return results, valid
+
+
+@router.post('/bulk', response_model=UserBulkList)
+def create_users_bulk(
+    users: Annotated[list[UserSchema], Body(max_length=MAX_BULK_SIZE)],
+    session: T_Session,
+    admin: T_CurrentAdmin,
+):
+    """
+    Endpoint administrativo para criar usuários em lote.
+
+    Os conflitos de nome de usuário e e-mail, tanto com o banco quanto
+    dentro do próprio lote, são detectados com uma única consulta. As
+    senhas dos usuários válidos são criptografadas em paralelo, sem
+    manter uma conexão retirada do pool, e todos são inseridos com uma
+    única instrução. Se outra requisição criar um usuário conflitante
+    nesse intervalo, os conflitos são verificados novamente e apenas os
+    itens afetados falham. O código de status HTTP retornado é 200
+    (OK), com o resultado de cada item em `results`.
+
+    Args:
+        users (list[UserSchema]): Os usuários a serem criados, no
+        máximo MAX_BULK_SIZE por requisição.
+        session (Session): A sessão de banco de dados a ser utilizada.
+        admin (User): O administrador autenticado.
+
+    Raises:
+        HTTPException: Se o usuário autenticado não for administrador.
+        IntegrityError: Se o banco rejeitar os usuários por um motivo
+        que não seja a unicidade do nome ou do e-mail.
+
+    Returns:
+        UserBulkList: O resultado de cada usuário, na mesma ordem da
+        requisição.
+    """
+    results, valid = bulk_conflicts(session, users)
+    hashes = {}
+    created = []
+
+    while valid:
+        # Encerra a transação da consulta para que a conexão volte ao
+        # pool enquanto os hashes, que usam apenas CPU, são calculados
+        session.rollback()
+        missing = [index for index in valid if index not in hashes]
+        hashes.update(
+            zip(
+                missing,
+                get_password_hashes([users[i].password for i in missing]),
+            )
+        )
+
+        try:
+            created = session.execute(
+                insert(User).returning(
+                    *USER_PUBLIC_COLUMNS, sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        'username': users[index].username,
+                        'email': users[index].email,
+                        'password': hashes[index],
+                    }
+                    for index in valid
+                ],
+            ).all()
+            session.commit()
+            break
+        except IntegrityError as error:
+            session.rollback()
+            if unique_violation_detail(error) is None:
+                raise
+            # Um usuário criado por outra requisição ocupou um nome ou
+            # e-mail do lote: os conflitos são verificados de novo e
+            # reportados por item, e os demais usuários são inseridos
+            results, valid = bulk_conflicts(session, users)
+
+    for index, db_user in zip(valid, created):
+        results[index] = {
+            'index': index,
+            'status': HTTPStatus.CREATED,
+            'user': db_user,
+        }
+
+    return {'results': results}
@@ -37,6 +37,42 @@ class UserSchema(BaseModel):
     password: str
 
 
+class UserUpdate(BaseModel):
+    """
+    Schema para a atualização completa de um usuário (PUT).
+
+    A senha é opcional: quando omitida, ou igual à atual, o hash
+    armazenado é mantido.
+
+    Attributes:
+        username (str): O nome de usuário.
+        email (EmailStr): O endereço de email do usuário.
+        password (str | None): A nova senha do usuário.
+    """
+
+    username: str
+    email: EmailStr
+    password: str | None = None
+
+
+class UserPatch(BaseModel):
+    """
+    Schema para a atualização parcial de um usuário (PATCH).
+
+    Todos os campos são opcionais. Apenas os campos fornecidos serão
+    atualizados.
+
+    Attributes:
+        username (str | None): Novo nome de usuário.
+        email (EmailStr | None): Novo endereço de email.
+        password (str | None): Nova senha do usuário.
+    """
+
+    username: str | None = None
+    email: EmailStr | None = None
+    password: str | None = None
+
+
 class UserPublic(BaseModel):
     """
     Schema para os dados públicos do usuário.
@@ -74,9 +110,45 @@ class UserList(BaseModel):
 
     Attributes:
         users (list[UserPublic]): A lista de usuários.
+        total (int | None): Total de usuários encontrados, presente
+        apenas quando solicitado com `include_total`.
+        next_cursor (int | None): Cursor para buscar a próxima página,
+        presente apenas quando a página está cheia.
     """
 
     users: list[UserPublic]
+    total: int | None = None
+    next_cursor: int | None = None
+
+
+class UserBulkResult(BaseModel):
+    """
+    Schema para o resultado de um item da criação de usuários em lote.
+
+    Attributes:
+        index (int): A posição do usuário na lista enviada.
+        status (int): O código de status HTTP do item, 201 (Created)
+        ou 400 (Bad Request).
+        user (UserPublic | None): O usuário criado, quando houver.
+        detail (str | None): O motivo da falha, quando houver.
+    """
+
+    index: int
+    status: int
+    user: UserPublic | None = None
+    detail: str | None = None
+
+
+class UserBulkList(BaseModel):
+    """
+    Schema para a resposta da criação de usuários em lote.
+
+    Attributes:
+        results (list[UserBulkResult]): O resultado de cada usuário
+        enviado, na mesma ordem da requisição.
+    """
+
+    results: list[UserBulkResult]
 
 
 class Token(BaseModel):
@@ -129,9 +201,12 @@ class TodoList(BaseModel):
 
     Attributes:
         todos (list[TodoPublic]): Uma lista de tarefas públicas.
+        total (int | None): Total de tarefas que correspondem aos filtros,
+        presente apenas quando solicitado com `include_total`.
     """
 
     todos: list[TodoPublic]
+    total: int | None = None
 
 
 class TodoUpdate(BaseModel):
@@ -148,3 +223,79 @@ class TodoUpdate(BaseModel):
     """
 
     title: str | None = None
+
+
+class SlowQuery(BaseModel):
+    """
+    Esquema para representar uma consulta lenta registrada.
+
+    Attributes:
+        statement (str): O SQL executado.
+        parameters (list | dict): Os parâmetros, com textos mascarados.
+        duration_ms (float): A duração da consulta em milissegundos.
+        route (str | None): A rota que executou a consulta.
+        plan (list[str] | None): O plano de execução, para consultas
+        SELECT.
+        recorded_at (datetime): O momento do registro.
+    """
+
+    statement: str
+    parameters: list | dict
+    duration_ms: float
+    route: str | None
+    plan: list[str] | None
+    recorded_at: datetime
+
+
+class SlowQueryList(BaseModel):
+    """
+    Esquema para a listagem das consultas lentas.
+
+    Attributes:
+        queries (list[SlowQuery]): As consultas, da mais recente à
+        mais antiga.
+    """
+
+    queries: list[SlowQuery]
+
+
+class Health(BaseModel):
+    """
+    Esquema para a resposta do endpoint de liveness.
+
+    Attributes:
+        status (str): O status do processo.
+    """
+
+    status: str
+
+
+class ReadinessChecks(BaseModel):
+    """
+    Esquema para o resultado de cada verificação de readiness.
+
+    Attributes:
+        warmup (bool): Se o aquecimento terminou.
+        draining (bool): Se a instância está drenando; uma instância
+        drenando não está pronta.
+        database (bool): Se o banco respondeu ao ping.
+        pool (bool): Se o pool ainda tem conexões livres.
+    """
+
+    warmup: bool
+    draining: bool
+    database: bool
+    pool: bool
+
+
+class Readiness(BaseModel):
+    """
+    Esquema para a resposta do endpoint de readiness.
+
+    Attributes:
+        status (str): 'ready' ou 'not ready'.
+        checks (ReadinessChecks): O resultado de cada verificação.
+    """
+
+    status: str
+    checks: ReadinessChecks
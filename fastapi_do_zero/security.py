@@ -1,27 +1,41 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import cache
 from http import HTTPStatus
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
 from jwt.exceptions import ExpiredSignatureError, PyJWTError
-from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 from zoneinfo import ZoneInfo
 
-from fastapi_do_zero.database import get_session
+from fastapi_do_zero.database import get_read_session
+from fastapi_do_zero.instrumentation import timed
+from fastapi_do_zero.metrics import PASSWORD_HASH_DURATION
 from fastapi_do_zero.models import User
-from fastapi_do_zero.settings import Settings
-
-# Configuração do gerador de hash de senha recomendado
-pwd_context = PasswordHash.recommended()
+from fastapi_do_zero.settings import get_settings
 
 # Esquema de autenticação OAuth2 com token de senha
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 
-# Instânciando o settings para utilização no arquivo
-settings = Settings()
+
+@cache
+def get_password_context():
+    """
+    Obtém o gerador de hash de senha recomendado (Argon2).
+
+    O pwdlib e o argon2 são importados apenas no primeiro uso, fora do
+    caminho de importação da aplicação.
+
+    Returns:
+        PasswordHash: O gerador de hash de senha.
+    """
+    from pwdlib import PasswordHash  # noqa: PLC0415
+
+    return PasswordHash.recommended()
 
 
 def get_password_hash(password: str):
@@ -34,7 +48,34 @@ def get_password_hash(password: str):
     Returns:
         str: A senha criptografada.
     """
-    return pwd_context.hash(password)
+    with timed('hash_time'), PASSWORD_HASH_DURATION.time('hash'):
+        return get_password_context().hash(password)
+
+
+def get_password_hashes(passwords: list[str]):
+    """
+    Gera os hashes de várias senhas em paralelo.
+
+    O Argon2 libera o GIL durante o cálculo do hash, então as senhas
+    são processadas em threads, uma por núcleo disponível.
+
+    Args:
+        passwords (list[str]): As senhas em texto limpo.
+
+    Returns:
+        list[str]: As senhas criptografadas, na mesma ordem.
+    """
+    if not passwords:
+        return []
+
+    # As threads do executor não herdam o contexto da requisição, então
+    # o tempo é medido para o lote inteiro
+    max_workers = min(len(passwords), os.cpu_count() or 1)
+    with (
+        timed('hash_time'),
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        return list(executor.map(get_password_hash, passwords))
 
 
 def verify_password(plain_password: str, hashed_password: str):
@@ -48,7 +89,8 @@ def verify_password(plain_password: str, hashed_password: str):
     Returns:
         bool: True se as senhas corresponderem, False caso contrário.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    with timed('hash_time'), PASSWORD_HASH_DURATION.time('verify'):
+        return get_password_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict):
@@ -61,6 +103,7 @@ def create_access_token(data: dict):
     Returns:
         str: O token JWT.
     """
+    settings = get_settings()
     to_encode = data.copy()
 
     # Configura o tempo de expiração do token
@@ -79,14 +122,17 @@ def create_access_token(data: dict):
 
 
 def get_current_user(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     token: str = Depends(oauth2_scheme),
 ):
     """
     Obtém o usuário atual a partir do token de acesso.
 
     Args:
-        session (Session): Sessão do banco de dados.
+        session (Session): Sessão somente leitura do banco de dados.
+        Ela é fechada após a busca do usuário, devolvendo a conexão ao
+        pool antes de a rota abrir a sua; as rotas de leitura continuam
+        usando a mesma sessão, que obtém uma nova conexão se necessário.
         token (str): Token de acesso JWT.
 
     Raises:
@@ -101,6 +147,7 @@ def get_current_user(
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
+    settings = get_settings()
     try:
         payload = decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -117,7 +164,38 @@ def get_current_user(
 
     user = session.scalar(select(User).where(User.username == username))
 
+    # Desanexa o usuário, que continua com os dados carregados, e libera
+    # a conexão: nas rotas de escrita, a sessão da rota usará outra
+    if user:
+        session.expunge(user)
+    session.close()
+
     if not user:
         raise credentials_exception
 
     return user
+
+
+def get_current_admin(user: User = Depends(get_current_user)):
+    """
+    Obtém o usuário atual garantindo que ele seja um administrador.
+
+    Os administradores são marcados pela coluna `is_admin`, que a API
+    não altera. O nome de usuário não é usado, pois pode ser trocado
+    pelo próprio usuário.
+
+    Args:
+        user (User): O usuário autenticado.
+
+    Raises:
+        HTTPException: Se o usuário não for um administrador.
+
+    Returns:
+        User: O usuário administrador autenticado.
+    """
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
+        )
+
+    return user
@@ -0,0 +1,183 @@
+"""
+Geração de dados em grande volume para benchmarks.
+
+Cria N usuários e distribui as tarefas entre eles seguindo uma lei de
+potência (Pareto): poucos usuários concentram a maior parte das
+tarefas, como em uma base real. Os títulos e descrições têm tamanhos
+variados e os estados seguem uma proporção típica.
+
+As linhas são inseridas em lotes com `insert()` (executemany), sem
+passar pelo ORM, e todos os usuários recebem o mesmo hash de senha,
+calculado uma única vez. O banco é o de `DATABASE_URL`, SQLite ou
+PostgreSQL, já migrado (ou criado com `--create-tables`).
+
+Uso:
+    python -m fastapi_do_zero.seed --users 10000 --todos 1000000
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from fastapi_do_zero.database import get_engine
+from fastapi_do_zero.models import Todo, TodoState, User, table_registry
+from fastapi_do_zero.security import get_password_hash
+
+# Senha de todos os usuários gerados
+SEED_PASSWORD = 'senha'
+
+# Proporção de cada estado entre as tarefas geradas
+STATE_WEIGHTS = {
+    TodoState.draft: 10,
+    TodoState.todo: 30,
+    TodoState.doing: 20,
+    TodoState.done: 35,
+    TodoState.trash: 5,
+}
+
+WORDS = (
+    'comprar revisar enviar estudar pagar ligar agendar organizar '
+    'relatório reunião conta mercado projeto cliente código documento '
+    'consulta viagem contrato planilha apresentação pedido tarefa '
+    'semana amanhã urgente pendente final novo antigo equipe'
+).split()
+
+
+def text(min_words: int, mean_words: float) -> str:
+    """
+    Gera um texto com quantidade de palavras log-normal.
+
+    Args:
+        min_words (int): A quantidade mínima de palavras.
+        mean_words (float): A quantidade típica de palavras.
+
+    Returns:
+        str: O texto gerado.
+    """
+    count = max(min_words, round(random.lognormvariate(0, 0.6) * mean_words))
+    return ' '.join(random.choices(WORDS, k=count))
+
+
+def todos_per_user(users: int, todos: int, alpha: float) -> list[int]:
+    """
+    Distribui as tarefas entre os usuários seguindo uma lei de potência.
+
+    Args:
+        users (int): A quantidade de usuários.
+        todos (int): A quantidade total de tarefas.
+        alpha (float): O expoente da distribuição de Pareto. Valores
+        menores concentram mais tarefas em poucos usuários.
+
+    Returns:
+        list[int]: A quantidade de tarefas de cada usuário, somando
+        exatamente `todos`.
+    """
+    weights = [random.paretovariate(alpha) for _ in range(users)]
+    total = sum(weights)
+    counts = [int(todos * weight / total) for weight in weights]
+
+    # Os arredondamentos para baixo vão para os usuários mais pesados
+    heaviest = sorted(range(users), key=weights.__getitem__, reverse=True)
+    for index in heaviest[: todos - sum(counts)]:
+        counts[index] += 1
+    return counts
+
+
+def chunked(rows, size: int):
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def seed(
+    session: Session,
+    users: int,
+    todos: int,
+    chunk_size: int = 5000,
+    alpha: float = 1.2,
+) -> list[int]:
+    """
+    Insere os usuários e as tarefas no banco.
+
+    Args:
+        session (Session): A sessão do banco de dados.
+        users (int): A quantidade de usuários.
+        todos (int): A quantidade total de tarefas.
+        chunk_size (int): A quantidade de linhas por INSERT.
+        alpha (float): O expoente da distribuição de tarefas.
+
+    Returns:
+        list[int]: Os ids dos usuários criados.
+    """
+    password = get_password_hash(SEED_PASSWORD)
+    prefix = f'seed{time.time_ns():x}'
+
+    user_ids = []
+    for chunk in chunked(range(users), chunk_size):
+        user_ids.extend(
+            session.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'username': f'{prefix}_{n}',
+                        'email': f'{prefix}_{n}@example.com',
+                        'password': password,
+                    }
+                    for n in chunk
+                ],
+            )
+        )
+    session.commit()
+
+    states = list(STATE_WEIGHTS)
+    weights = list(STATE_WEIGHTS.values())
+    rows = (
+        {
+            'title': text(1, 4),
+            'description': text(3, 20),
+            'state': random.choices(states, weights)[0],
+            'user_id': user_id,
+        }
+        for user_id, count in zip(
+            user_ids, todos_per_user(users, todos, alpha)
+        )
+        for _ in range(count)
+    )
+    for chunk in chunked(rows, chunk_size):
+        session.execute(insert(Todo), chunk)
+        session.commit()
+
+    return user_ids
+
+
+def main():  # pragma: no cover
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--todos', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--alpha', type=float, default=1.2)
+    parser.add_argument('--random-seed', type=int)
+    parser.add_argument('--create-tables', action='store_true')
+    args = parser.parse_args()
+
+    engine = get_engine()
+    random.seed(args.random_seed)
+    if args.create_tables:
+        table_registry.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    with Session(engine) as session:
+        seed(session, args.users, args.todos, args.chunk_size, args.alpha)
+
+    print(
+        f'{args.users} usuários e {args.todos} tarefas criados em '
+        f'{time.perf_counter() - start:.1f} s (senha: {SEED_PASSWORD})'
+    )
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
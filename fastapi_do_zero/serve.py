@@ -0,0 +1,165 @@
+"""
+Ponto de entrada do servidor de produção.
+
+Executa a aplicação com o uvicorn em vários processos (workers), um por
+núcleo por padrão, usando o uvloop e o httptools quando instalados.
+Cada worker é reiniciado após um número máximo de requisições, com uma
+variação aleatória (jitter) por worker, para que não reiniciem todos ao
+mesmo tempo.
+
+Os workers são criados com `spawn` pelo uvicorn e cada um cria o seu
+próprio engine no primeiro uso. Servidores que criam os workers com
+`fork` depois de importar a aplicação (ex.: gunicorn com `--preload`)
+são atendidos por `database.dispose_engine_after_fork`.
+
+Antes de criar os workers, remove os retratos de métricas deixados em
+`METRICS_DIR` pela execução anterior.
+
+Uso:
+    python -m fastapi_do_zero.serve --workers 4 --max-requests 10000
+"""
+
+import argparse
+import inspect
+import logging
+import os
+import random
+from importlib.util import find_spec
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from fastapi_do_zero.metrics import remove_snapshots
+from fastapi_do_zero.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+APP = 'fastapi_do_zero.app:app'
+
+
+def event_loop() -> str:
+    """Escolhe o uvloop, se instalado, ou o loop padrão do asyncio."""
+    return 'uvloop' if find_spec('uvloop') else 'asyncio'
+
+
+def http_protocol() -> str:
+    """Escolhe o parser httptools, se instalado, ou o h11."""
+    return 'httptools' if find_spec('httptools') else 'h11'
+
+
+class JitteredConfig(uvicorn.Config):
+    """
+    Configuração do uvicorn com variação no máximo de requisições.
+
+    O limite efetivo de `limit_max_requests` é sorteado uma vez em cada
+    processo, entre o limite configurado e o limite somado ao jitter.
+
+    Args:
+        max_requests_jitter (int): A variação máxima do limite.
+        *args, **kwargs: Os argumentos de `uvicorn.Config`.
+    """
+
+    def __init__(self, *args, max_requests_jitter: int = 0, **kwargs):
+        self.max_requests_jitter = max_requests_jitter
+        super().__init__(*args, **kwargs)
+
+    @property
+    def limit_max_requests(self) -> int | None:
+        if self.base_max_requests is None:
+            return None
+        if self.jitter_pid != os.getpid():
+            self.jitter_pid = os.getpid()
+            self.jittered_max_requests = self.base_max_requests + (
+                random.randint(0, self.max_requests_jitter)
+            )
+        return self.jittered_max_requests
+
+    @limit_max_requests.setter
+    def limit_max_requests(self, value: int | None):
+        self.base_max_requests = value
+        self.jitter_pid = None
+
+
+def build_config(args: argparse.Namespace) -> JitteredConfig:
+    """
+    Monta a configuração do uvicorn a partir dos argumentos.
+
+    Args:
+        args (Namespace): Os argumentos da linha de comando.
+
+    Returns:
+        JitteredConfig: A configuração do servidor.
+    """
+    return JitteredConfig(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=event_loop(),
+        http=http_protocol(),
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        limit_max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        proxy_headers=True,
+        access_log=args.access_log,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument(
+        '--keep-alive',
+        type=int,
+        default=5,
+        help='Segundos que uma conexão ociosa é mantida aberta',
+    )
+    parser.add_argument('--max-requests', type=int)
+    parser.add_argument('--max-requests-jitter', type=int, default=0)
+    parser.add_argument('--access-log', action='store_true')
+    return parser.parse_args(argv)
+
+
+def supervisor(config: JitteredConfig, server: uvicorn.Server, sock):
+    """
+    Cria o supervisor dos workers.
+
+    Versões antigas do uvicorn recebem a função executada pelos workers
+    em `target`; as recentes a obtêm da própria configuração.
+    """
+    if 'target' in inspect.signature(Multiprocess).parameters:
+        return Multiprocess(config, target=server.run, sockets=[sock])
+    return Multiprocess(config, sockets=[sock])
+
+
+def main():  # pragma: no cover
+    config = build_config(parse_args())
+    metrics_dir = get_settings().METRICS_DIR
+    if metrics_dir:
+        remove_snapshots(metrics_dir)
+    server = uvicorn.Server(config)
+
+    # O uvicorn configura apenas os seus loggers (e remove os handlers
+    # existentes ao criar a configuração), então o log da aplicação é
+    # habilitado depois dela
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        '%d workers (loop %s, http %s)',
+        config.workers,
+        config.loop,
+        config.http,
+    )
+
+    if config.workers > 1:
+        sock = config.bind_socket()
+        supervisor(config, server, sock).run()
+    else:
+        server.run()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -1,3 +1,5 @@
+from functools import cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,6 +17,60 @@ class Settings(BaseSettings):
         Ele faz a leitura de um arquivo .env.
         DATABASE_URL (str): URL de conexão com o banco de dados.
         Obtida do arquivo .env.
+        COMPRESSION_ENABLED (bool): Habilita a compressão das respostas.
+        COMPRESSION_MINIMUM_SIZE (int): Tamanho mínimo, em bytes, de uma
+        resposta para que ela seja comprimida.
+        GZIP_COMPRESSION_LEVEL (int): Nível de compressão do gzip (1 a 9).
+        ZSTD_COMPRESSION_LEVEL (int): Nível de compressão do zstd (1 a 22).
+        SERVER_TIMING_ENABLED (bool): Adiciona o cabeçalho Server-Timing
+        e registra em log os tempos de cada requisição.
+        DEBUG (bool): Modo de depuração. Adiciona às respostas o
+        cabeçalho X-Query-Count com a quantidade de consultas.
+        QUERY_COUNT_WARNING_THRESHOLD (int | None): Quantidade de
+        consultas por requisição a partir da qual um aviso é registrado.
+        METRICS_ENABLED (bool): Habilita o endpoint /metrics e a coleta
+        das métricas de cada requisição.
+        METRICS_DIR (str | None): Diretório compartilhado em que cada
+        worker grava as suas métricas, para que o /metrics exponha a
+        soma de todos os workers. None expõe apenas o processo atual.
+        SLOW_QUERY_LOG_ENABLED (bool): Registra as consultas lentas,
+        exibidas em /admin/slow-queries.
+        SLOW_QUERY_THRESHOLD_MS (float): Duração, em milissegundos, a
+        partir da qual uma consulta é considerada lenta.
+        SLOW_QUERY_LOG_SIZE (int): Quantidade de consultas lentas
+        mantidas em memória.
+        SLOW_QUERY_EXPLAIN (bool): Captura o plano de execução das
+        consultas lentas.
+        PROFILING_TOKEN (str | None): Token que, enviado no cabeçalho
+        X-Profile, perfila a requisição. None desabilita o perfilamento.
+        PROFILING_DIR (str | None): Diretório onde os perfis são
+        gravados. None retorna o perfil no lugar da resposta.
+        PROFILING_MIN_INTERVAL (float): Intervalo mínimo, em segundos,
+        entre dois perfis.
+        WARMUP_ENABLED (bool): Aquece o banco, o hash de senha e os
+        schemas na inicialização, antes de a aplicação ficar pronta.
+        WARMUP_CONNECTIONS (int): Quantidade de conexões do pool abertas
+        no aquecimento.
+        DB_POOL_SIZE (int): Conexões mantidas abertas no pool do banco.
+        DB_MAX_OVERFLOW (int): Conexões que podem ser abertas além de
+        DB_POOL_SIZE. Também é o limite usado pelo /readyz para
+        considerar o pool saturado. Negativo não limita.
+        HEALTH_CACHE_SECONDS (float): Por quantos segundos o resultado
+        do ping ao banco feito pelo /readyz é reaproveitado.
+        DRAIN_FILE (str | None): Arquivo cuja existência faz o /readyz
+        responder 503, para retirar a instância do balanceador.
+        THREADPOOL_SIZE (int): Quantidade de threads do pool que executa
+        as rotas síncronas.
+        LOAD_SHEDDING_ENABLED (bool): Rejeita com 503 as requisições que
+        excedem os limites abaixo.
+        LOAD_SHEDDING_LIMITS (dict[str, int]): Máximo de requisições em
+        andamento por classe de rota ('auth', 'reads' e 'writes').
+        LOAD_SHEDDING_MAX_QUEUE (int | None): Máximo de tarefas
+        esperando uma thread livre no pool. None não limita a fila.
+        LOAD_SHEDDING_RETRY_AFTER (int): Segundos informados no
+        cabeçalho Retry-After das respostas 503.
+        SINGLE_FLIGHT_ENABLED (bool): Agrupa as leituras idênticas e
+        simultâneas das rotas marcadas com `single_flight.coalesce`.
     """
 
     model_config = SettingsConfigDict(
@@ -25,3 +81,59 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 500
+    GZIP_COMPRESSION_LEVEL: int = 6
+    ZSTD_COMPRESSION_LEVEL: int = 3
+
+    SERVER_TIMING_ENABLED: bool = False
+    DEBUG: bool = False
+    QUERY_COUNT_WARNING_THRESHOLD: int | None = 10
+
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: str | None = None
+
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    PROFILING_TOKEN: str | None = None
+    PROFILING_DIR: str | None = None
+    PROFILING_MIN_INTERVAL: float = 60.0
+
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 5
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    HEALTH_CACHE_SECONDS: float = 2.0
+    DRAIN_FILE: str | None = None
+
+    THREADPOOL_SIZE: int = 40
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_LIMITS: dict[str, int] = {
+        'auth': 16,
+        'reads': 200,
+        'writes': 100,
+    }
+    LOAD_SHEDDING_MAX_QUEUE: int | None = 100
+    LOAD_SHEDDING_RETRY_AFTER: int = 1
+
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+
+@cache
+def get_settings() -> Settings:
+    """
+    Obtém as configurações da aplicação.
+
+    As configurações são lidas do ambiente e do `.env` na primeira
+    chamada e a mesma instância é reaproveitada nas seguintes.
+
+    Returns:
+        Settings: As configurações da aplicação.
+    """
+    return Settings()
@@ -0,0 +1,162 @@
+"""
+Agrupamento (single-flight) de leituras idênticas e simultâneas.
+
+Em picos de tráfego, muitos clientes pedem o mesmo recurso ao mesmo
+tempo (ex.: `GET /users/{user_id}`) e um mesmo usuário repete chamadas
+ao `GET /todos/`. As rotas marcadas com `coalesce` executam apenas uma
+vez para cada grupo de requisições idênticas em andamento: a primeira
+executa a rota, com as consultas ao banco e a serialização, e as que
+chegam enquanto ela não termina recebem uma cópia da mesma resposta.
+
+Requisições são idênticas quando têm o mesmo caminho, os mesmos
+parâmetros de consulta e os mesmos cabeçalhos Authorization e Accept,
+então respostas de usuários diferentes nunca são compartilhadas. Nada
+fica em cache: assim que a execução termina, a próxima requisição
+executa a rota novamente.
+
+Os tempos de banco e de serialização ficam apenas no `RequestStats` da
+requisição que executou a rota, porque a execução herda o contexto
+dela. As demais do grupo respondem com Server-Timing e log sem tempo
+de banco nem consultas, o que reflete o trabalho que elas de fato
+fizeram.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+from fastapi_do_zero.metrics import COALESCED_REQUESTS
+
+
+def coalesce(endpoint: Callable) -> Callable:
+    """
+    Marca a rota para agrupar as leituras idênticas e simultâneas.
+
+    Deve ser aplicado abaixo do decorador da rota, ex.:
+
+        @router.get('/{user_id}')
+        @coalesce
+        def read_user(...): ...
+
+    A rota precisa usar `NegotiatedRoute`, que faz o agrupamento.
+
+    Args:
+        endpoint (Callable): A função da rota.
+
+    Returns:
+        Callable: A mesma função, marcada.
+    """
+    endpoint.single_flight = True
+    return endpoint
+
+
+def request_key(request: Request) -> Hashable:
+    """
+    Identifica as requisições que podem compartilhar uma resposta.
+
+    Args:
+        request (Request): A requisição.
+
+    Returns:
+        Hashable: O método, o caminho, os parâmetros de consulta e os
+        cabeçalhos que identificam o usuário e o formato da resposta.
+    """
+    return (
+        request.method,
+        request.url.path,
+        request.scope['query_string'],
+        request.headers.get('authorization'),
+        request.headers.get('accept'),
+    )
+
+
+def copy_response(response: Response) -> Response:
+    """
+    Copia a resposta para uma das requisições agrupadas.
+
+    Os middlewares alteram os cabeçalhos de cada resposta (ex.:
+    Server-Timing e Content-Encoding), então cada requisição recebe
+    os seus próprios cabeçalhos sobre o mesmo corpo já serializado.
+
+    Apenas respostas com o corpo em memória podem ser copiadas: as de
+    streaming e de arquivo só podem ser enviadas uma vez, e uma tarefa
+    em segundo plano seria executada uma vez por cópia.
+
+    Args:
+        response (Response): A resposta produzida pela rota.
+
+    Raises:
+        TypeError: Se a resposta for de streaming ou de arquivo, ou se
+        tiver uma tarefa em segundo plano.
+
+    Returns:
+        Response: Uma resposta com o mesmo status, cabeçalhos e corpo.
+    """
+    if isinstance(response, StreamingResponse | FileResponse):
+        raise TypeError(
+            f'Coalesced routes must return a body in memory, '
+            f'not {type(response).__name__}'
+        )
+    if response.background is not None:
+        raise TypeError('Coalesced routes cannot use background tasks')
+
+    copy = Response(response.body, status_code=response.status_code)
+    copy.raw_headers = list(response.raw_headers)
+    return copy
+
+
+class SingleFlight:
+    """
+    Grupo de execuções em andamento, por chave.
+
+    A execução corre em uma tarefa própria, protegida do cancelamento:
+    se o cliente que a iniciou desconectar, as demais requisições do
+    grupo continuam aguardando o resultado. Os erros, como um
+    HTTPException 404, também são repassados a todo o grupo.
+
+    Args:
+        name (str): O nome do grupo, usado como rótulo da métrica.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+        self, key: Hashable, function: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        """
+        Executa a função ou aguarda a execução em andamento da chave.
+
+        Args:
+            key (Hashable): A chave das requisições idênticas.
+            function (Callable): A função que produz a resposta.
+
+        Returns:
+            Response: Uma cópia da resposta produzida.
+        """
+        call = self.calls.get(key)
+        if call is None:
+            call = self.calls[key] = asyncio.ensure_future(function())
+            call.add_done_callback(lambda _: self.forget(key, call))
+        else:
+            COALESCED_REQUESTS.inc(self.name)
+
+        return copy_response(await asyncio.shield(call))
+
+    def forget(self, key: Hashable, call: asyncio.Future):
+        """
+        Remove a execução concluída da chave.
+
+        A chave só é removida se a execução guardada ainda for `call`:
+        se uma execução mais nova já ocupou a chave, ela não é
+        descartada.
+
+        Args:
+            key (Hashable): A chave da execução.
+            call (asyncio.Future): A execução que terminou.
+        """
+        if self.calls.get(key) is call:
+            del self.calls[key]
@@ -0,0 +1,223 @@
+"""
+Registro das consultas lentas.
+
+O `SlowQueryRecorder` mede cada consulta executada pelo engine e guarda
+as que passam do limite configurado, com os parâmetros mascarados, a
+rota que as originou e o plano de execução do banco. Apenas as últimas
+entradas são mantidas, em um buffer circular exposto pelo endpoint
+administrativo `/admin/slow-queries`.
+
+O plano é obtido com `EXPLAIN QUERY PLAN` no SQLite e `EXPLAIN` no
+PostgreSQL, executados em um cursor próprio da mesma conexão, para não
+descartar o resultado da consulta original nem disparar de novo os
+eventos do engine. O EXPLAIN roda dentro de um SAVEPOINT: no
+PostgreSQL, um erro fora dele abortaria a transação da requisição.
+"""
+
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from threading import Lock
+
+from sqlalchemy import Engine, event
+from zoneinfo import ZoneInfo
+
+from fastapi_do_zero.instrumentation import current_route
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+
+EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+
+def redact(value):
+    """
+    Mascara um parâmetro de consulta.
+
+    Números, booleanos e nulos são mantidos, pois costumam ser ids e
+    limites úteis para reproduzir a consulta. Textos e bytes podem
+    conter senhas, e-mails e tokens, então apenas o tipo e o tamanho
+    são registrados.
+
+    Args:
+        value: O valor do parâmetro.
+
+    Returns:
+        O valor, se for seguro, ou a sua descrição.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__} len={len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact_parameters(parameters):
+    """
+    Mascara os parâmetros de uma consulta, em tupla ou dicionário.
+
+    Args:
+        parameters: Os parâmetros no formato do driver.
+
+    Returns:
+        Os parâmetros com os valores mascarados.
+    """
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    return [redact(value) for value in parameters or ()]
+
+
+class SlowQueryRecorder:
+    """
+    Registra as consultas que passam do limite de duração.
+
+    Args:
+        threshold_ms (float): Duração mínima, em milissegundos, para
+        uma consulta ser registrada.
+        capacity (int): Quantidade de entradas mantidas no buffer.
+        explain (bool): Captura o plano de execução das consultas
+        SELECT registradas.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 100.0,
+        capacity: int = 100,
+        explain: bool = True,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.entries: deque[dict] = deque(maxlen=capacity)
+        self.lock = Lock()
+
+    def configure(self, threshold_ms: float, capacity: int, explain: bool):
+        """
+        Altera o limite, a capacidade e a captura de planos.
+
+        As entradas já registradas são mantidas, até a nova capacidade.
+        """
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        with self.lock:
+            self.entries = deque(self.entries, maxlen=capacity)
+
+    def install(self, engine: Engine):
+        """
+        Registra no engine os eventos que medem as consultas.
+
+        Args:
+            engine (Engine): O engine a ser observado.
+        """
+        if not event.contains(
+            engine, 'before_cursor_execute', self.before_cursor_execute
+        ):
+            event.listen(
+                engine, 'before_cursor_execute', self.before_cursor_execute
+            )
+            event.listen(
+                engine, 'after_cursor_execute', self.after_cursor_execute
+            )
+
+    @staticmethod
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, *a
+    ):
+        """
+        Guarda o início da consulta no contexto de execução, que só
+        existe durante a consulta, mesmo que ela falhe.
+        """
+        context.slow_query_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, *args):
+        """Registra a consulta, se ela passou do limite."""
+        # Os argumentos restantes são o contexto e o executemany
+        context, executemany = args
+        start = context.slow_query_start
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        plan = None
+        if self.explain and not executemany:
+            plan = self.explain_plan(conn, statement, parameters)
+
+        entry = {
+            'statement': statement,
+            'parameters': redact_parameters(parameters),
+            'duration_ms': round(duration_ms, 2),
+            'route': current_route(),
+            'plan': plan,
+            'recorded_at': datetime.now(tz=ZoneInfo('UTC')),
+        }
+        with self.lock:
+            self.entries.append(entry)
+
+        logger.warning(
+            'Slow query (%.2f ms) on %s: %s',
+            duration_ms,
+            entry['route'],
+            statement,
+        )
+
+    @staticmethod
+    def explain_plan(conn, statement: str, parameters) -> list[str] | None:
+        """
+        Obtém o plano de execução de uma consulta SELECT.
+
+        Um EXPLAIN que falha é desfeito até o SAVEPOINT, mantendo a
+        transação da requisição utilizável.
+
+        Args:
+            conn (Connection): A conexão que executou a consulta.
+            statement (str): O SQL executado.
+            parameters: Os parâmetros no formato do driver.
+
+        Returns:
+            list[str] | None: As linhas do plano, a mensagem de erro do
+            EXPLAIN, ou None se a consulta não for um SELECT ou o banco
+            não for suportado.
+        """
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(
+            'SELECT'
+        ):
+            return None
+
+        dbapi_error = conn.dialect.loaded_dbapi.Error
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f'SAVEPOINT {EXPLAIN_SAVEPOINT}')
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            except dbapi_error:
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}')
+                raise
+            finally:
+                cursor.execute(f'RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}')
+        except dbapi_error as error:
+            return [f'EXPLAIN failed: {error}']
+        finally:
+            cursor.close()
+
+        # O SQLite retorna (id, parent, notused, detail) e o PostgreSQL
+        # uma coluna com cada linha do plano
+        return [str(row[-1]) for row in rows]
+
+    def recent(self) -> list[dict]:
+        """
+        Lista as consultas registradas, da mais recente à mais antiga.
+
+        Returns:
+            list[dict]: As entradas do buffer.
+        """
+        with self.lock:
+            return list(reversed(self.entries))
+
+
+recorder = SlowQueryRecorder()
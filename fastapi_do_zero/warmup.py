@@ -0,0 +1,114 @@
+"""
+Aquecimento da aplicação na inicialização.
+
+Sem aquecimento, as primeiras requisições após um deploy pagam pela
+abertura das conexões do pool, pela compilação das consultas do
+SQLAlchemy (guardadas no cache de compilação do engine), pela primeira
+alocação de memória do Argon2 e pela primeira geração de JWT. O
+`warm_up` executa esses caminhos antes de a aplicação ser marcada como
+pronta. Falhas são registradas em log e não impedem a inicialização.
+"""
+
+import logging
+import time
+
+from jwt import decode
+from sqlalchemy import Engine, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from fastapi_do_zero.models import Todo, User
+from fastapi_do_zero.responses import SchemaResponse
+from fastapi_do_zero.routers.todo import TODO_PUBLIC_COLUMNS
+from fastapi_do_zero.routers.users import USER_PUBLIC_COLUMNS
+from fastapi_do_zero.schemas import TodoList, UserList
+from fastapi_do_zero.security import (
+    create_access_token,
+    get_password_hash,
+    verify_password,
+)
+from fastapi_do_zero.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def representative_statements() -> list:
+    """
+    Monta as consultas no mesmo formato das usadas pelas rotas.
+
+    O cache de compilação do SQLAlchemy é indexado pela estrutura da
+    consulta, não pelos valores, então executar estas consultas com
+    valores que não retornam linhas deixa as consultas das rotas
+    compiladas.
+
+    Returns:
+        list[Select]: As consultas de autenticação e leitura.
+    """
+    return [
+        select(User).where(User.username == 'warm-up'),
+        select(*USER_PUBLIC_COLUMNS).where(User.id == 0),
+        select(*USER_PUBLIC_COLUMNS).order_by(User.id).limit(1).offset(0),
+        select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == 0),
+    ]
+
+
+def warm_up_database(engine: Engine, connections: int):
+    """
+    Abre conexões do pool e compila as consultas das rotas.
+
+    Args:
+        engine (Engine): O engine da aplicação.
+        connections (int): Quantidade de conexões abertas ao mesmo
+        tempo, que voltam ao pool ao final.
+    """
+    opened = []
+    try:
+        opened.extend(engine.connect() for _ in range(connections))
+        for statement in representative_statements():
+            opened[0].execute(statement).all()
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def warm_up_security():
+    """Executa um ciclo de hash de senha e de JWT."""
+    verify_password('warm-up', get_password_hash('warm-up'))
+    settings = get_settings()
+    token = create_access_token({'sub': 'warm-up'})
+    decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def warm_up_schemas():
+    """Serializa respostas vazias dos schemas de listagem."""
+    SchemaResponse(TodoList, {'todos': []}, exclude_unset=True)
+    SchemaResponse(UserList, {'users': []}, exclude_unset=True)
+
+
+def warm_up(engine: Engine, connections: int) -> float:
+    """
+    Aquece o banco, a segurança e os schemas.
+
+    Args:
+        engine (Engine): O engine da aplicação.
+        connections (int): Quantidade de conexões do pool a abrir.
+
+    Returns:
+        float: A duração do aquecimento, em segundos.
+    """
+    start = time.perf_counter()
+
+    try:
+        warm_up_database(engine, connections)
+    except SQLAlchemyError:
+        logger.exception('Database warm-up failed')
+
+    warm_up_security()
+    warm_up_schemas()
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        'Warm-up finished in %.1f ms (%d connections)',
+        elapsed * 1000,
+        connections,
+    )
+    return elapsed
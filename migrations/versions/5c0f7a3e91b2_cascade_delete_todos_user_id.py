@@ -0,0 +1,47 @@
+"""cascade delete todos user_id
+
+Revision ID: 5c0f7a3e91b2
+Revises: d47b75112ec4
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0f7a3e91b2'
+down_revision: Union[str, None] = 'd47b75112ec4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A chave estrangeira foi criada sem nome. Esta convenção reproduz o nome
+# gerado pelo PostgreSQL e nomeia a chave refletida no modo batch do SQLite.
+naming_convention = {
+    'fk': '%(table_name)s_%(column_0_name)s_fkey',
+}
+
+
+def upgrade() -> None:
+    with op.batch_alter_table(
+        'todos', naming_convention=naming_convention
+    ) as batch_op:
+        batch_op.drop_constraint('todos_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'todos_user_id_fkey',
+            'users',
+            ['user_id'],
+            ['id'],
+            ondelete='CASCADE',
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table(
+        'todos', naming_convention=naming_convention
+    ) as batch_op:
+        batch_op.drop_constraint('todos_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'todos_user_id_fkey', 'users', ['user_id'], ['id']
+        )
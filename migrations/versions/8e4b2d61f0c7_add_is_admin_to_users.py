@@ -0,0 +1,27 @@
+"""add is_admin to users
+
+Revision ID: 8e4b2d61f0c7
+Revises: 5c0f7a3e91b2
+Create Date: 2026-10-19 09:41:07.552310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b2d61f0c7'
+down_revision: Union[str, None] = '5c0f7a3e91b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('is_admin')
@@ -0,0 +1,35 @@
+"""username c collation index
+
+Revision ID: b7d3e5a09c14
+Revises: 8e4b2d61f0c7
+Create Date: 2026-10-19 10:27:53.118642
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e5a09c14'
+down_revision: Union[str, None] = '8e4b2d61f0c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A busca por prefixo compara username com COLLATE "C" no PostgreSQL. No
+# SQLite a collation padrão (BINARY) já segue a ordem dos code points.
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_users_username_c',
+            'users',
+            [sa.text('username COLLATE "C"')],
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_username_c', table_name='users')
@@ -1,15 +1,23 @@
+from contextlib import contextmanager
+
 import factory
 import factory.fuzzy
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from fastapi_do_zero.app import app
-from fastapi_do_zero.database import get_session
+from fastapi_do_zero.database import (
+    ReadSession,
+    get_read_session,
+    get_session,
+)
+from fastapi_do_zero.instrumentation import instrument_engine
 from fastapi_do_zero.models import Todo, TodoState, User, table_registry
 from fastapi_do_zero.security import get_password_hash
+from fastapi_do_zero.settings import get_settings
 
 
 class UserFactory(factory.Factory):
@@ -76,18 +84,22 @@ class TodoFactory(factory.Factory):
 
 
 @pytest.fixture()
-def client(session):
+def client(session, monkeypatch):
     """
     Fixture para criar um cliente de teste para a aplicação FastAPI.
 
     Esta fixture cria um cliente de teste que pode ser usado para
     fazer requisições à aplicação durante os testes. Ela substitui
     a dependência `get_session` pela sessão de banco de dados
-    configurada para testes.
+    configurada para testes e a dependência `get_read_session` por
+    uma sessão somente leitura no mesmo banco. O aquecimento da
+    inicialização é desabilitado, pois o banco de testes é outro.
 
     Args:
         session (Session): Sessão de banco de dados configurada
         para testes.
+        monkeypatch (MonkeyPatch): Utilizado para desabilitar o
+        aquecimento.
 
     Yields:
         TestClient: Um cliente de teste configurado para fazer
@@ -97,8 +109,15 @@ def client(session):
     def get_session_override():
         return session
 
+    def get_read_session_override():
+        with ReadSession(bind=session.get_bind()) as read_session:
+            yield read_session
+
+    monkeypatch.setattr(get_settings(), 'WARMUP_ENABLED', False)
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_read_session_override
 
         yield client
 
@@ -125,6 +144,7 @@ def session():
         poolclass=StaticPool,
     )
     table_registry.metadata.create_all(engine)
+    instrument_engine(engine)
 
     # Inicia uma sessão de banco de dados
     with Session(engine) as session:
@@ -213,3 +233,48 @@ def token(client, user):
         data={'username': user.username, 'password': user.clean_password},
     )
     return response.json()['access_token']
+
+
+@pytest.fixture()
+def assert_num_queries(session):
+    """
+    Fixture para verificar a quantidade exata de consultas executadas.
+
+    Retorna um gerenciador de contexto que conta as instruções SQL
+    executadas no engine de testes, inclusive pelas requisições feitas
+    com a fixture `client`, e falha se a quantidade for diferente da
+    esperada, listando as instruções executadas.
+
+    Exemplo:
+        with assert_num_queries(2):
+            client.get('/todos/', headers=headers)
+
+    Args:
+        session (Session): Sessão de banco de dados configurada
+        para testes.
+
+    Returns:
+        Callable: O gerenciador de contexto, que recebe a quantidade
+        esperada de consultas.
+    """
+    engine = session.get_bind()
+
+    @contextmanager
+    def counter(expected: int):
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+
+        assert len(statements) == expected, '\n'.join([
+            f'{len(statements)} queries, {expected} expected:',
+            *statements,
+        ])
+
+    return counter
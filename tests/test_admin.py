@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from fastapi_do_zero.models import User
+from fastapi_do_zero.slow_queries import (
+    EXPLAIN_PREFIXES,
+    recorder,
+    redact_parameters,
+)
+from tests.conftest import UserFactory
+
+
+@pytest.fixture()
+def slow_queries(session, monkeypatch):
+    """
+    Fixture que registra todas as consultas do banco de testes como
+    lentas, com um limite de 0 ms.
+
+    Yields:
+        SlowQueryRecorder: O registro de consultas lentas.
+    """
+    monkeypatch.setattr(recorder, 'threshold_ms', 0.0)
+    monkeypatch.setattr(recorder, 'explain', True)
+    recorder.entries.clear()
+    recorder.install(session.get_bind())
+
+    yield recorder
+
+    recorder.entries.clear()
+
+
+def test_read_slow_queries(session, client, user, token, slow_queries):
+    """
+    Testa se as consultas de uma requisição aparecem no endpoint
+    administrativo com a rota, os parâmetros mascarados e o plano.
+    """
+    user.is_admin = True
+    session.commit()
+
+    client.get(
+        '/todos/?title=abc', headers={'Authorization': f'Bearer {token}'}
+    )
+    response = client.get(
+        '/admin/slow-queries', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    listing = next(
+        query
+        for query in response.json()['queries']
+        if query['route'] == 'GET /todos/' and 'todos' in query['statement']
+    )
+
+    assert '<str len=' in str(listing['parameters'])
+    assert any('todos' in line for line in listing['plan'])
+
+
+def test_read_slow_queries_not_admin(client, token):
+    """
+    Testa que apenas administradores acessam as consultas lentas.
+    """
+    response = client.get(
+        '/admin/slow-queries', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_failed_explain_keeps_transaction(session, slow_queries, monkeypatch):
+    """
+    Testa se um EXPLAIN que falha é registrado como falha sem desfazer
+    o que a transação da requisição já escreveu.
+    """
+    monkeypatch.setitem(EXPLAIN_PREFIXES, 'sqlite', 'EXPLAIN INVALID ')
+
+    session.add(UserFactory())
+    session.flush()
+    session.scalars(select(User)).all()
+    session.commit()
+
+    listing = next(
+        entry
+        for entry in slow_queries.recent()
+        if entry['statement'].startswith('SELECT')
+    )
+    assert listing['plan'][0].startswith('EXPLAIN failed')
+    assert session.scalar(select(func.count()).select_from(User)) == 1
+
+
+def test_failed_query_does_not_leak_start_time(session, user, slow_queries):
+    """
+    Testa se uma consulta que falha não deixa um início pendente e se
+    as consultas seguintes continuam sendo registradas.
+    """
+    with pytest.raises(IntegrityError):
+        session.execute(
+            insert(User).values(
+                username=user.username, email='x@x.com', password='x'
+            )
+        )
+    session.rollback()
+    slow_queries.entries.clear()
+
+    session.execute(select(User.id)).all()
+
+    assert [entry['statement'] for entry in slow_queries.recent()] == [
+        'SELECT users.id \nFROM users'
+    ]
+    assert 'slow_query_start' not in session.connection().info
+
+
+def test_redact_parameters():
+    """
+    Testa o mascaramento dos parâmetros das consultas.
+    """
+    assert redact_parameters((1, 'senha', None, b'ab')) == [
+        1,
+        '<str len=5>',
+        None,
+        '<bytes len=2>',
+    ]
+    assert redact_parameters({'id': 3, 'email': 'a@a.com'}) == {
+        'id': 3,
+        'email': '<str len=7>',
+    }
@@ -1,5 +1,10 @@
 from http import HTTPStatus
 
+from fastapi_do_zero.app import create_app
+from fastapi_do_zero.compression import CompressionMiddleware
+from fastapi_do_zero.load_shedding import LoadSheddingMiddleware
+from fastapi_do_zero.settings import get_settings
+
 
 def test_read_root_deve_retornar_ok_e_ola_mundo(client):
     """
@@ -26,3 +31,24 @@ def test_read_root_deve_retornar_ok_e_ola_mundo(client):
     assert response.status_code == HTTPStatus.OK
 
     assert response.json() == {'message': 'Olá Mundo!'}
+
+
+def test_create_app_uses_given_settings():
+    """
+    Teste da criação da aplicação com configurações explícitas, que
+    definem os middlewares habilitados sem depender do ambiente.
+
+    Raises:
+        AssertionError: Se a aplicação não usar as configurações
+        informadas.
+    """
+    settings = get_settings().model_copy(
+        update={'LOAD_SHEDDING_ENABLED': False, 'COMPRESSION_ENABLED': False}
+    )
+
+    app = create_app(settings)
+    middlewares = {middleware.cls for middleware in app.user_middleware}
+
+    assert app.state.settings is settings
+    assert LoadSheddingMiddleware not in middlewares
+    assert CompressionMiddleware not in middlewares
@@ -0,0 +1,146 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from fastapi_do_zero.compression import CompressionMiddleware, choose_encoding
+from tests.conftest import TodoFactory
+
+LARGE_SIZE = 1000
+
+
+@pytest.fixture()
+def compressed_client():
+    """
+    Fixture com uma aplicação mínima protegida pelo middleware de
+    compressão, com respostas pequena, grande e em streaming.
+
+    Yields:
+        TestClient: O cliente de teste da aplicação.
+    """
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get('/small')
+    def small():
+        return PlainTextResponse('x' * 10)
+
+    @app.get('/large')
+    def large():
+        return PlainTextResponse('x' * LARGE_SIZE)
+
+    @app.get('/stream')
+    def stream():
+        return StreamingResponse(
+            (f'linha {n}\n' for n in range(1000)), media_type='text/plain'
+        )
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_choose_encoding():
+    """
+    Testa a escolha da codificação pelo cabeçalho Accept-Encoding.
+    """
+    assert choose_encoding('gzip, deflate, br') == 'gzip'
+    assert choose_encoding('zstd;q=0.5, gzip') == 'gzip'
+    assert choose_encoding('identity') is None
+    assert choose_encoding(None) is None
+
+
+def test_small_response_is_not_compressed(compressed_client):
+    """
+    Testa que respostas abaixo do tamanho mínimo não são comprimidas.
+    """
+    response = compressed_client.get(
+        '/small', headers={'Accept-Encoding': 'gzip'}
+    )
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.text == 'x' * 10
+
+
+def test_response_without_accepted_encoding_has_vary(compressed_client):
+    """
+    Testa que respostas sem codificação aceita pelo cliente não são
+    comprimidas, mas informam que variam pelo Accept-Encoding.
+    """
+    response = compressed_client.get(
+        '/large', headers={'Accept-Encoding': 'identity'}
+    )
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert response.text == 'x' * LARGE_SIZE
+
+
+def test_large_response_gzip(compressed_client):
+    """
+    Testa a compressão gzip de uma resposta completa.
+    """
+    response = compressed_client.get(
+        '/large', headers={'Accept-Encoding': 'gzip'}
+    )
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) < LARGE_SIZE
+    assert response.text == 'x' * LARGE_SIZE
+
+
+def test_large_response_zstd(compressed_client):
+    """
+    Testa a compressão zstd de uma resposta completa, quando o pacote
+    opcional `zstandard` está instalado.
+    """
+    zstandard = pytest.importorskip('zstandard')
+
+    assert choose_encoding('gzip, deflate, br, zstd') == 'zstd'
+
+    with compressed_client.stream(
+        'GET', '/large', headers={'Accept-Encoding': 'zstd'}
+    ) as response:
+        raw = b''.join(response.iter_raw())
+
+    assert response.headers['content-encoding'] == 'zstd'
+    assert zstandard.ZstdDecompressor().decompress(raw) == b'x' * LARGE_SIZE
+
+
+def test_streaming_response_gzip(compressed_client):
+    """
+    Testa a compressão gzip de uma resposta em streaming.
+    """
+    with compressed_client.stream(
+        'GET', '/stream', headers={'Accept-Encoding': 'gzip'}
+    ) as response:
+        raw = b''.join(response.iter_raw())
+
+    expected = ''.join(f'linha {n}\n' for n in range(1000)).encode()
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert gzip.decompress(raw) == expected
+
+
+def test_app_compresses_large_todo_list(session, client, user, token):
+    """
+    Testa se a aplicação comprime uma listagem grande de tarefas.
+    """
+    expected_todos = 50
+    session.bulk_save_objects(TodoFactory.create_batch(50, user_id=user.id))
+    session.commit()
+
+    response = client.get(
+        '/todos/',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': 'gzip',
+        },
+    )
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.json()['todos']) == expected_todos
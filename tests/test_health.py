@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import create_engine
+
+from fastapi_do_zero.routers import health
+from fastapi_do_zero.routers.health import DatabaseHealth
+from fastapi_do_zero.settings import get_settings
+
+
+@pytest.fixture()
+def database_health(monkeypatch):
+    """
+    Substitui o cache do ping ao banco por um novo, vazio.
+    """
+    database_health = DatabaseHealth(ttl=60)
+    monkeypatch.setattr(health, 'database_health', database_health)
+    return database_health
+
+
+def test_liveness(client):
+    response = client.get('/healthz')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'status': 'ok'}
+
+
+def test_readiness(client, database_health):
+    response = client.get('/readyz')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'status': 'ready',
+        'checks': {
+            'warmup': True,
+            'draining': False,
+            'database': True,
+            'pool': True,
+        },
+    }
+
+
+def test_readiness_draining_file(
+    client, database_health, tmp_path, monkeypatch
+):
+    """
+    Testa se a existência do arquivo de drenagem retira a instância
+    do balanceador.
+    """
+    drain_file = tmp_path / 'drain'
+    drain_file.touch()
+    monkeypatch.setattr(get_settings(), 'DRAIN_FILE', str(drain_file))
+
+    response = client.get('/readyz')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json()['status'] == 'not ready'
+    assert response.json()['checks']['draining'] is True
+
+
+def test_readiness_caches_database_ping(client, database_health, monkeypatch):
+    """
+    Testa se uma falha no banco responde 503 e se o resultado do ping
+    é reaproveitado pelas sondas seguintes.
+    """
+    pings = []
+
+    def failing_ping():
+        pings.append(1)
+        return False
+
+    monkeypatch.setattr(health, 'ping', failing_ping)
+
+    first = client.get('/readyz')
+    second = client.get('/readyz')
+
+    assert first.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert second.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert second.json()['checks']['database'] is False
+    assert len(pings) == 1
+
+
+def test_database_health_returns_stale_result_while_pinging(monkeypatch):
+    """
+    Testa se, com um ping em andamento, as demais verificações recebem
+    o último resultado em vez de esperar pelo lock.
+    """
+    database_health = DatabaseHealth(ttl=0)
+    database_health.healthy = True
+    monkeypatch.setattr(health, 'ping', lambda: pytest.fail('ping'))
+
+    with database_health.lock:
+        assert database_health.check() is True
+
+
+def test_database_health_reads_ttl_lazily(monkeypatch):
+    """
+    Testa se o intervalo do cache vem das configurações da primeira
+    verificação, e não das do momento da importação.
+    """
+    ttl = 30.0
+    monkeypatch.setattr(get_settings(), 'HEALTH_CACHE_SECONDS', ttl)
+    monkeypatch.setattr(health, 'ping', lambda: True)
+    database_health = DatabaseHealth()
+
+    database_health.check()
+
+    assert database_health.ttl == ttl
+
+
+def test_readiness_pool_saturated(client, database_health, monkeypatch):
+    monkeypatch.setattr(health, 'pool_available', lambda: False)
+
+    response = client.get('/readyz')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json()['checks']['pool'] is False
+
+
+def test_pool_available():
+    """
+    Testa o pool de um banco em memória, que não tem limite de
+    conexões.
+    """
+    assert health.pool_available()
+
+
+def test_pool_available_with_queue_pool(tmp_path, monkeypatch):
+    """
+    Testa se um QueuePool com todas as conexões em uso é considerado
+    saturado.
+    """
+    engine = create_engine(
+        f'sqlite:///{tmp_path}/app.db', pool_size=1, max_overflow=0
+    )
+    monkeypatch.setattr(health, 'get_engine', lambda: engine)
+    monkeypatch.setattr(get_settings(), 'DB_MAX_OVERFLOW', 0)
+
+    assert health.pool_available()
+    with engine.connect():
+        assert not health.pool_available()
+    engine.dispose()
@@ -0,0 +1,24 @@
+from benchmarks.import_time import (
+    IMPORT_TIME_BUDGET_MS,
+    PROJECT_IMPORT_TIME_BUDGET_MS,
+    measure_imports,
+    project_ms,
+    total_ms,
+)
+
+
+def test_app_import_time_budget():
+    """
+    Testa se a importação da aplicação fica dentro do orçamento e se
+    o hash de senha e o driver do banco continuam fora da importação.
+    """
+    entries = measure_imports('fastapi_do_zero.app')
+    modules = {entry.module for entry in entries}
+
+    assert total_ms(entries, 'fastapi_do_zero.app') < IMPORT_TIME_BUDGET_MS
+    assert (
+        project_ms(entries, 'fastapi_do_zero') < PROJECT_IMPORT_TIME_BUDGET_MS
+    )
+    assert 'pwdlib' not in modules
+    assert 'sqlalchemy.dialects.sqlite' not in modules
+    assert 'sqlite3' not in modules
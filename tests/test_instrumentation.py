@@ -0,0 +1,169 @@
+import json
+import logging
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from fastapi_do_zero.app import app
+from fastapi_do_zero.instrumentation import (
+    RequestStats,
+    RequestStatsMiddleware,
+    current_stats,
+)
+from fastapi_do_zero.models import User
+from fastapi_do_zero.responses import TimedORJSONResponse, to_msgpack
+from tests.conftest import TodoFactory
+
+
+def test_server_timing_header(client, user, token, caplog):
+    """
+    Testa o cabeçalho Server-Timing e a linha de log de uma requisição.
+
+    Verifica se as consultas ao banco, o tempo de serialização e o
+    tempo total aparecem no cabeçalho e no log estruturado.
+    """
+    timed_client = TestClient(RequestStatsMiddleware(app))
+
+    with caplog.at_level(logging.INFO, 'fastapi_do_zero.instrumentation'):
+        response = timed_client.get(
+            '/todos/', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    header = response.headers['server-timing']
+    queries = int(re.search(r'desc="(\d+) queries"', header).group(1))
+
+    assert queries > 0
+    assert 'serialize;dur=' in header
+    assert 'total;dur=' in header
+
+    log = json.loads(caplog.records[-1].getMessage())
+
+    assert log['route'] == '/todos/'
+    assert log['status'] == response.status_code
+    assert log['query_count'] == queries
+
+
+def test_server_timing_hash_time(client, user):
+    """
+    Testa se o tempo de verificação da senha é contabilizado no login.
+    """
+    timed_client = TestClient(RequestStatsMiddleware(app))
+
+    response = timed_client.post(
+        '/auth/token',
+        data={'username': user.username, 'password': user.clean_password},
+    )
+
+    hash_time = re.search(
+        r'hash;dur=([\d.]+)', response.headers['server-timing']
+    )
+
+    assert float(hash_time.group(1)) > 0
+
+
+def test_query_count_header_and_warning(client, user, token, caplog):
+    """
+    Testa o cabeçalho X-Query-Count do modo de depuração e o aviso de
+    excesso de consultas.
+    """
+    debug_client = TestClient(
+        RequestStatsMiddleware(
+            app, server_timing=False, debug=True, query_warning_threshold=1
+        )
+    )
+
+    with caplog.at_level(logging.WARNING, 'fastapi_do_zero.instrumentation'):
+        response = debug_client.get(
+            '/todos/', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.headers['x-query-count'] == '2'
+    assert 'server-timing' not in response.headers
+    assert 'GET /todos/ executed 2 queries (threshold 1)' in caplog.text
+
+
+def test_list_todos_query_count(
+    session, client, user, token, assert_num_queries
+):
+    """
+    Testa a quantidade de consultas da listagem de tarefas: a busca do
+    usuário autenticado e a listagem, com o total na mesma consulta.
+    """
+    session.bulk_save_objects(TodoFactory.create_batch(3, user_id=user.id))
+    session.commit()
+
+    with assert_num_queries(2):
+        client.get(
+            '/todos/?include_total=true',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+
+def test_read_users_query_count(client, user, other_user, assert_num_queries):
+    """
+    Testa a quantidade de consultas da listagem de usuários.
+    """
+    with assert_num_queries(1):
+        client.get('/users/?include_total=true')
+
+
+def test_create_user_query_count(client, assert_num_queries):
+    """
+    Testa a quantidade de consultas da criação de usuário: o INSERT,
+    sem consulta prévia de unicidade, e a leitura dos valores gerados.
+    """
+    with assert_num_queries(2) as statements:
+        client.post(
+            '/users/',
+            json={'username': 'a', 'email': 'a@a.com', 'password': '1'},
+        )
+
+    assert statements[0].startswith('INSERT')
+
+
+def test_serialize_time_default_and_msgpack_responses():
+    """
+    Testa se a geração do JSON padrão das rotas e a conversão para
+    MessagePack são somadas no tempo de serialização.
+    """
+    content = {'todos': [{'id': n, 'title': 'x' * 50} for n in range(1000)]}
+
+    stats = RequestStats()
+    token = current_stats.set(stats)
+    try:
+        response = TimedORJSONResponse(content)
+        json_time = stats.serialize_time
+        to_msgpack(response)
+    finally:
+        current_stats.reset(token)
+
+    assert json_time > 0
+    assert stats.serialize_time > json_time
+
+
+def test_failed_query_does_not_leak_start_time(session, user):
+    """
+    Testa se uma consulta que falha (IntegrityError) não deixa um
+    início pendente na conexão e se as consultas seguintes continuam
+    sendo medidas.
+    """
+    stats = RequestStats()
+    token = current_stats.set(stats)
+    try:
+        with pytest.raises(IntegrityError):
+            session.execute(
+                insert(User).values(
+                    username=user.username, email='x@x.com', password='x'
+                )
+            )
+        session.rollback()
+        session.execute(select(User.id)).all()
+    finally:
+        current_stats.reset(token)
+
+    assert stats.query_count == 1
+    assert stats.db_time < 1
+    assert 'query_start_time' not in session.connection().info
@@ -0,0 +1,117 @@
+from http import HTTPStatus
+
+import pytest
+from anyio import to_thread
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fastapi_do_zero import load_shedding
+from fastapi_do_zero.load_shedding import LoadSheddingMiddleware, route_class
+from fastapi_do_zero.metrics import SHED_REQUESTS
+from fastapi_do_zero.settings import get_settings
+
+
+def make_app(**kwargs) -> tuple[FastAPI, LoadSheddingMiddleware]:
+    """
+    Cria uma aplicação mínima protegida pelo middleware.
+    """
+    app = FastAPI()
+
+    @app.get('/items')
+    def read_items():
+        return {'in_flight': middleware.in_flight['reads']}
+
+    @app.get('/healthz')
+    async def liveness():
+        return {'status': 'ok'}
+
+    middleware = LoadSheddingMiddleware(app, **kwargs)
+    return app, middleware
+
+
+@pytest.mark.parametrize(
+    ('method', 'path', 'expected'),
+    [
+        ('POST', '/auth/token', 'auth'),
+        ('POST', '/auth/refresh_token', 'writes'),
+        ('POST', '/users/', 'auth'),
+        ('POST', '/users/bulk', 'auth'),
+        ('PUT', '/users/1', 'writes'),
+        ('PATCH', '/users/1', 'writes'),
+        ('GET', '/todos/', 'reads'),
+        ('HEAD', '/users/1', 'reads'),
+        ('POST', '/todos/', 'writes'),
+        ('DELETE', '/users/1', 'writes'),
+    ],
+)
+def test_route_class(method, path, expected):
+    """
+    Testa a classe de custo atribuída a cada método e caminho.
+    """
+    assert route_class({'method': method, 'path': path}) == expected
+
+
+def test_load_shedding_allows_requests_under_limit():
+    """
+    Testa se uma requisição dentro do limite segue para a aplicação e
+    se o contador de requisições em andamento volta a zero.
+    """
+    _, middleware = make_app(limits={'reads': 1})
+
+    response = TestClient(middleware).get('/items')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'in_flight': 1}
+    assert middleware.in_flight['reads'] == 0
+
+
+def test_load_shedding_rejects_over_in_flight_limit():
+    """
+    Testa se uma classe de rota sem vagas recebe 503 com Retry-After
+    e se o descarte é contado na métrica.
+    """
+    _, middleware = make_app(limits={'reads': 0}, retry_after=3)
+    before = SHED_REQUESTS.snapshot().get(('reads', 'in_flight'), [0])[0]
+
+    response = TestClient(middleware).get('/items')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '3'
+    assert SHED_REQUESTS.snapshot()[('reads', 'in_flight')][0] == before + 1
+
+
+def test_load_shedding_rejects_over_queue_limit(monkeypatch):
+    """
+    Testa se a requisição recebe 503 quando a fila do pool de threads
+    chegou ao limite.
+    """
+    _, middleware = make_app(limits={}, max_queue=5)
+    monkeypatch.setattr(load_shedding, 'threadpool_queue', lambda: 5)
+
+    response = TestClient(middleware).get('/items')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_load_shedding_never_rejects_health_probes():
+    """
+    Testa se as sondas de saúde respondem mesmo sem vagas e com a fila
+    cheia.
+    """
+    _, middleware = make_app(limits={'reads': 0}, max_queue=0)
+
+    response = TestClient(middleware).get('/healthz')
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_lifespan_sets_threadpool_size(client):
+    """
+    Testa se o lifespan ajusta o pool de threads do AnyIO para
+    `THREADPOOL_SIZE`.
+    """
+    total_tokens = client.portal.call(
+        lambda: to_thread.current_default_thread_limiter().total_tokens
+    )
+
+    assert total_tokens == get_settings().THREADPOOL_SIZE
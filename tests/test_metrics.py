@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import time
+
+from fastapi_do_zero.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    remove_snapshots,
+)
+
+
+def sample(text: str, line: str) -> float:
+    """
+    Lê o valor de uma amostra no texto de exposição.
+    """
+    match = re.search(rf'^{re.escape(line)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1))
+
+
+def test_metrics_endpoint(client, user):
+    """
+    Testa se o /metrics contabiliza as requisições pelo modelo da rota.
+    """
+    client.get(f'/users/{user.id}')
+    client.get(f'/users/{user.id}')
+
+    response = client.get('/metrics')
+    text = response.text
+
+    assert response.headers['content-type'].startswith('text/plain')
+    assert (
+        sample(
+            text,
+            'http_requests_total'
+            '{method="GET",route="/users/{user_id}",status="200"}',
+        )
+        >= 2  # noqa: PLR2004
+    )
+    assert (
+        sample(
+            text,
+            'http_request_duration_seconds_bucket'
+            '{method="GET",route="/users/{user_id}",le="+Inf"}',
+        )
+        >= 2  # noqa: PLR2004
+    )
+    assert '# TYPE http_requests_in_flight gauge' in text
+
+
+def test_metrics_hash_duration(client, user):
+    """
+    Testa se a verificação de senha do login aparece no histograma de
+    duração dos hashes.
+    """
+    client.post(
+        '/auth/token',
+        data={'username': user.username, 'password': user.clean_password},
+    )
+
+    text = client.get('/metrics').text
+
+    assert (
+        sample(
+            text, 'password_hash_duration_seconds_count{operation="verify"}'
+        )
+        >= 1
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    """
+    Testa o texto gerado para um histograma.
+    """
+    registry = Registry()
+    histogram = registry.register(
+        Histogram('latency', 'Latência.', ('route',), buckets=(0.1, 1.0))
+    )
+
+    histogram.observe(0.05, '/a')
+    histogram.observe(0.5, '/a')
+    histogram.observe(5, '/a')
+
+    text = registry.render()
+
+    assert 'latency_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_count{route="/a"} 3' in text
+    assert 'latency_sum{route="/a"} 5.55' in text
+
+
+def test_registry_aggregates_workers(tmp_path):
+    """
+    Testa a soma das métricas gravadas por outros workers no diretório
+    compartilhado. Gauges de processos encerrados são ignorados.
+    """
+    registry = Registry()
+    counter = registry.register(Counter('hits', 'Acessos.', ('route',)))
+    gauge = registry.register(Gauge('busy', 'Em andamento.'))
+    registry.configure(str(tmp_path))
+
+    counter.inc('/a')
+    gauge.inc()
+    registry.flush()
+
+    dead_pid = 2**22 + 1
+    (tmp_path / f'{dead_pid}.json').write_text(
+        json.dumps({'hits': [[['/a'], [4.0]]], 'busy': [[[], [7.0]]]})
+    )
+    (tmp_path / f'{os.getppid()}.json').write_text(
+        json.dumps({'hits': [[['/b'], [2.0]]], 'busy': [[[], [3.0]]]})
+    )
+
+    text = registry.render()
+
+    assert 'hits{route="/a"} 5' in text
+    assert 'hits{route="/b"} 2' in text
+    assert 'busy 4' in text
+
+
+def test_registry_ignores_stray_files(tmp_path):
+    """
+    Testa se arquivos .json que não são retratos de um worker são
+    ignorados, em vez de derrubar o /metrics.
+    """
+    registry = Registry()
+    counter = registry.register(Counter('hits', 'Acessos.'))
+    registry.configure(str(tmp_path))
+    counter.inc()
+    (tmp_path / 'tmp.json').write_text(json.dumps({'hits': [[[], [9.0]]]}))
+    (tmp_path / 'notes.json').write_text('não é json')
+
+    text = registry.render()
+
+    assert 'hits 1' in text
+
+
+def test_registry_flushes_in_background(tmp_path):
+    """
+    Testa a gravação periódica do retrato em uma thread e a gravação
+    final ao parar.
+    """
+    registry = Registry()
+    counter = registry.register(Counter('hits', 'Acessos.'))
+    registry.configure(str(tmp_path), flush_interval=0.01)
+    path = tmp_path / f'{os.getpid()}.json'
+
+    registry.start()
+    counter.inc()
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    counter.inc()
+    registry.stop()
+
+    assert registry.flusher is None
+    assert json.loads(path.read_text()) == {'hits': [[[], [2.0]]]}
+
+
+def test_registry_without_directory_does_not_start():
+    """
+    Testa se, sem diretório compartilhado, nenhuma thread é criada.
+    """
+    registry = Registry()
+
+    registry.start()
+
+    assert registry.flusher is None
+
+
+def test_remove_snapshots(tmp_path):
+    """
+    Testa a limpeza dos retratos de uma execução anterior, mantendo os
+    demais arquivos do diretório.
+    """
+    (tmp_path / '123.json').write_text('{}')
+    (tmp_path / '123.tmp').write_text('{}')
+    (tmp_path / 'README').write_text('')
+
+    remove_snapshots(str(tmp_path))
+
+    assert [path.name for path in tmp_path.iterdir()] == ['README']
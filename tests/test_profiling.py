@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fastapi_do_zero.profiling import ProfilingMiddleware, StackSampler
+
+TOKEN = 'segredo'
+
+
+class ProfilingTestsMiddleware(ProfilingMiddleware):
+    """
+    Middleware de perfilamento que conta as pilhas dos testes.
+    """
+
+    modules = ('tests',)
+
+
+def busy(seconds: float):
+    """
+    Ocupa a CPU pelo tempo informado.
+    """
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def build_client(**options):
+    """
+    Cria uma aplicação mínima com uma rota síncrona lenta, protegida
+    pelo middleware de perfilamento.
+    """
+    app = FastAPI()
+    app.add_middleware(ProfilingTestsMiddleware, token=TOKEN, **options)
+
+    @app.get('/slow')
+    def slow():
+        busy(0.1)
+        return {'ok': True}
+
+    return TestClient(app)
+
+
+@pytest.fixture()
+def profiled_client():
+    """
+    Fixture com o perfil retornado no lugar da resposta.
+
+    Returns:
+        TestClient: O cliente de teste da aplicação.
+    """
+    return build_client(min_interval=60.0)
+
+
+def test_profile_inline(profiled_client):
+    """
+    Testa se uma requisição autorizada retorna o perfil em pilhas
+    dobradas, com a função lenta da rota síncrona.
+    """
+    response = profiled_client.get('/slow', headers={'X-Profile': TOKEN})
+
+    assert response.headers['x-profiled-status'] == '200'
+    assert 'tests.test_profiling:busy' in response.text
+    assert response.text.splitlines()[0].rsplit(' ', 1)[1].isdigit()
+
+
+def test_profile_requires_token(profiled_client):
+    """
+    Testa que requisições sem o token correto não são perfiladas.
+    """
+    response = profiled_client.get('/slow', headers={'X-Profile': 'errado'})
+
+    assert response.json() == {'ok': True}
+
+
+def test_profile_rate_limited(profiled_client):
+    """
+    Testa que um segundo perfil dentro do intervalo mínimo não é gerado.
+    """
+    profiled_client.get('/slow', headers={'X-Profile': TOKEN})
+    response = profiled_client.get('/slow', headers={'X-Profile': TOKEN})
+
+    assert response.json() == {'ok': True}
+
+
+def test_profile_written_to_directory(tmp_path):
+    """
+    Testa a gravação do perfil em arquivo, mantendo a resposta original.
+    """
+    client = build_client(directory=str(tmp_path))
+
+    response = client.get('/slow', headers={'X-Profile': TOKEN})
+
+    (profile,) = tmp_path.glob('*-GET-slow.folded')
+
+    assert response.json() == {'ok': True}
+    assert 'tests.test_profiling:busy' in profile.read_text()
+
+
+def test_profile_blocking_work_off_event_loop(tmp_path, monkeypatch):
+    """
+    Testa se a espera pela thread amostradora e a gravação do perfil
+    rodam fora da thread do loop de eventos.
+    """
+    threads = {}
+    client = build_client(directory=str(tmp_path))
+    original_stop = StackSampler.stop
+    original_write = ProfilingMiddleware.write
+
+    def stop(sampler):
+        threads['stop'] = threading.get_ident()
+        original_stop(sampler)
+
+    def write(middleware, scope, folded):
+        threads['write'] = threading.get_ident()
+        return original_write(middleware, scope, folded)
+
+    monkeypatch.setattr(StackSampler, 'stop', stop)
+    monkeypatch.setattr(ProfilingMiddleware, 'write', write)
+
+    with client:
+        loop_thread = client.portal.call(threading.get_ident)
+        client.get('/slow', headers={'X-Profile': TOKEN})
+
+    assert threads['stop'] != loop_thread
+    assert threads['write'] != loop_thread
@@ -0,0 +1,175 @@
+import json
+from http import HTTPStatus
+
+import msgpack
+import pytest
+
+from fastapi_do_zero.instrumentation import RequestStats, current_stats
+from fastapi_do_zero.responses import (
+    SchemaResponse,
+    TimedORJSONResponse,
+    prefers_msgpack,
+)
+from fastapi_do_zero.schemas import TodoPublic, UserList, UserPublic
+
+
+def test_prefers_msgpack():
+    """
+    Testa a negociação do cabeçalho Accept.
+
+    Verifica se MessagePack só é escolhido quando pedido
+    explicitamente com qualidade não menor que a de JSON.
+    """
+    assert prefers_msgpack('application/msgpack')
+    assert prefers_msgpack('application/json;q=0.5, application/x-msgpack')
+    assert not prefers_msgpack(None)
+    assert not prefers_msgpack('*/*')
+    assert not prefers_msgpack('application/msgpack;q=0.5, application/json')
+
+
+def test_schema_response():
+    """
+    Testa a resposta gerada a partir de um schema.
+
+    Verifica o código de status, a omissão dos campos não definidos com
+    `exclude_unset` e se `to_python` corresponde ao corpo em JSON.
+    """
+    content = {'id': 1, 'username': 'ana', 'email': 'ana@ana.com'}
+
+    response = SchemaResponse(
+        UserPublic, content, status_code=HTTPStatus.CREATED
+    )
+    partial = SchemaResponse(UserPublic, content, exclude_unset=True)
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.media_type == 'application/json'
+    assert json.loads(response.body) == {
+        **content,
+        'created_at': None,
+        'updated_at': None,
+    }
+    assert response.to_python() == json.loads(response.body)
+    assert partial.status_code == HTTPStatus.OK
+    assert json.loads(partial.body) == content
+    assert partial.to_python() == json.loads(partial.body)
+
+
+def test_timed_orjson_response_render_adds_serialize_time():
+    """
+    Testa se a geração do JSON da resposta padrão é somada ao tempo de
+    serialização da requisição.
+    """
+    content = {'todos': [{'id': n, 'title': 'x' * 50} for n in range(1000)]}
+    response = TimedORJSONResponse(None)
+
+    stats = RequestStats()
+    token = current_stats.set(stats)
+    try:
+        body = response.render(content)
+    finally:
+        current_stats.reset(token)
+
+    assert json.loads(body) == content
+    assert stats.serialize_time > 0
+
+
+def test_create_todo_msgpack_round_trip(client, token):
+    """
+    Testa a criação de uma tarefa com corpo e resposta em MessagePack.
+
+    Verifica se a resposta decodificada é válida no schema TodoPublic,
+    com o estado como string e as datas em ISO 8601.
+    """
+    response = client.post(
+        '/todos/',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/msgpack',
+            'Accept': 'application/msgpack',
+        },
+        content=msgpack.packb({
+            'title': 'Test todo',
+            'description': 'Test todo description',
+            'state': 'draft',
+        }),
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/msgpack'
+
+    data = msgpack.unpackb(response.content)
+    todo = TodoPublic.model_validate(data)
+
+    assert data['state'] == 'draft'
+    assert isinstance(data['created_at'], str)
+    assert todo.model_dump(mode='json') == data
+
+
+def test_create_user_msgpack_body(client):
+    """
+    Testa a criação de um usuário com corpo em MessagePack e resposta
+    em JSON.
+    """
+    response = client.post(
+        '/users/',
+        headers={'Content-Type': 'application/msgpack'},
+        content=msgpack.packb({
+            'username': 'Samael',
+            'email': 'sama@gmail.com',
+            'password': '1234',
+        }),
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert UserPublic.model_validate(response.json()).username == 'Samael'
+
+
+def test_read_users_msgpack(client, user):
+    """
+    Testa a listagem de usuários em MessagePack.
+
+    Verifica se o conteúdo decodificado corresponde ao schema UserList.
+    """
+    response = client.get('/users/', headers={'Accept': 'application/msgpack'})
+
+    data = msgpack.unpackb(response.content)
+
+    assert response.headers['content-type'] == 'application/msgpack'
+    assert UserList.model_validate(data).users[0].username == user.username
+
+
+def test_invalid_msgpack_body(client):
+    """
+    Testa o envio de um corpo que não é MessagePack válido.
+    """
+    response = client.post(
+        '/users/',
+        headers={'Content-Type': 'application/msgpack'},
+        content=b'\xc1',
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid msgpack body'}
+
+
+@pytest.mark.parametrize(
+    'value',
+    [b'Samael', msgpack.Timestamp(0), msgpack.ExtType(1, b'x')],
+)
+def test_msgpack_body_without_json_equivalent(client, value):
+    """
+    Testa o envio de valores MessagePack sem equivalente em JSON
+    (bin, timestamp e ext), que devem ser rejeitados com 400.
+    """
+    response = client.post(
+        '/users/',
+        headers={'Content-Type': 'application/msgpack'},
+        content=msgpack.packb({
+            'username': value,
+            'email': 'sama@gmail.com',
+            'password': '1234',
+        }),
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid msgpack body'}
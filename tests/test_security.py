@@ -1,8 +1,10 @@
 from http import HTTPStatus
 
 from jwt import decode
+from sqlalchemy import event
 
-from fastapi_do_zero.security import create_access_token, settings
+from fastapi_do_zero.security import create_access_token
+from fastapi_do_zero.settings import get_settings
 
 
 def test_jwt():
@@ -21,6 +23,7 @@ def test_jwt():
     # Cria o token JWT
     token = create_access_token(data)
     # Decodifica o token JWT
+    settings = get_settings()
     decoded = decode(
         token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
     )
@@ -58,3 +61,110 @@ def test_jwt_invalid_token(client):
 
     # Verifica se a mensagem de erro é a esperada
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def checkouts_peak(session, request):
+    """
+    Executa uma requisição contando as conexões retiradas ao mesmo tempo.
+
+    Args:
+        session (Session): Sessão de banco de dados para os testes. Ela
+        é confirmada antes, para não manter uma conexão retirada.
+        request (Callable): Função que faz a requisição.
+
+    Returns:
+        tuple[Response, int]: A resposta e o maior número de conexões
+        retiradas do pool ao mesmo tempo durante a requisição.
+    """
+    session.commit()
+    checked_out = [0]
+    peak = [0]
+
+    def on_checkout(*args):
+        checked_out[0] += 1
+        peak[0] = max(peak[0], checked_out[0])
+
+    def on_checkin(*args):
+        checked_out[0] -= 1
+
+    engine = session.get_bind()
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', on_checkin)
+    try:
+        response = request()
+    finally:
+        event.remove(engine, 'checkout', on_checkout)
+        event.remove(engine, 'checkin', on_checkin)
+
+    return response, peak[0]
+
+
+def test_current_user_releases_read_connection(client, session, token):
+    """
+    Teste para a busca do usuário autenticado em uma rota de leitura.
+
+    A conexão da busca do usuário volta para o pool antes da consulta
+    da rota, então a requisição usa uma conexão por vez.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        session (Session): Sessão de banco de dados para os testes.
+        token (str): Token de acesso do usuário.
+
+    Raises:
+        AssertionError: Se a requisição retirar mais de uma conexão
+        ao mesmo tempo.
+    """
+    response, peak = checkouts_peak(
+        session,
+        lambda: client.get(
+            '/todos/', headers={'Authorization': f'Bearer {token}'}
+        ),
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert peak == 1
+
+
+def test_current_user_write_route_single_connection(
+    client, session, user, token
+):
+    """
+    Teste para a busca do usuário autenticado em rotas de escrita.
+
+    A sessão de leitura usada para buscar o usuário é fechada antes de
+    a sessão da rota abrir a sua conexão, então a requisição nunca
+    retém duas conexões do pool ao mesmo tempo.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        session (Session): Sessão de banco de dados para os testes.
+        user (User): O usuário autenticado.
+        token (str): Token de acesso do usuário.
+
+    Raises:
+        AssertionError: Se alguma requisição retirar mais de uma
+        conexão ao mesmo tempo.
+    """
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'/users/{user.id}'
+
+    response, peak = checkouts_peak(
+        session,
+        lambda: client.post(
+            '/todos/',
+            headers=headers,
+            json={'title': 't', 'description': 'd', 'state': 'draft'},
+        ),
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert peak == 1
+
+    response, peak = checkouts_peak(
+        session,
+        lambda: client.patch(url, headers=headers, json={'email': 'x@x.com'}),
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert peak == 1
@@ -0,0 +1,39 @@
+import random
+
+from sqlalchemy import func, select
+
+from fastapi_do_zero.models import Todo, User
+from fastapi_do_zero.seed import seed, todos_per_user
+
+
+def test_todos_per_user_is_skewed():
+    """
+    Testa se a distribuição das tarefas soma o total pedido e concentra
+    a maior parte das tarefas em poucos usuários.
+    """
+    users, todos = 100, 10_000
+    random.seed(1)
+    counts = sorted(todos_per_user(users, todos, alpha=1.2), reverse=True)
+
+    assert sum(counts) == todos
+    assert sum(counts[:20]) > sum(counts[20:])
+
+
+def test_seed(session):
+    """
+    Testa a criação dos usuários e tarefas em lotes.
+    """
+    expected_users = 30
+    expected_todos = 500
+
+    user_ids = seed(session, expected_users, expected_todos, chunk_size=64)
+
+    assert len(user_ids) == expected_users
+    assert (
+        session.scalar(select(func.count()).select_from(User))
+        == expected_users
+    )
+    assert (
+        session.scalar(select(func.count()).select_from(Todo))
+        == expected_todos
+    )
@@ -0,0 +1,70 @@
+import os
+
+from fastapi_do_zero import serve
+from fastapi_do_zero.database import dispose_engine_after_fork, get_engine
+
+MAX_REQUESTS = 1000
+JITTER = 100
+
+
+def test_build_config():
+    """
+    Testa a configuração do servidor a partir dos argumentos.
+    """
+    config = serve.build_config(
+        serve.parse_args([
+            '--workers',
+            '3',
+            '--max-requests',
+            str(MAX_REQUESTS),
+            '--max-requests-jitter',
+            str(JITTER),
+        ])
+    )
+
+    assert config.workers == 3  # noqa: PLR2004
+    assert config.loop == serve.event_loop()
+    assert config.http == serve.http_protocol()
+    assert MAX_REQUESTS <= config.limit_max_requests <= MAX_REQUESTS + JITTER
+
+
+def test_max_requests_jitter_per_process(monkeypatch):
+    """
+    Testa se o limite de requisições é sorteado uma vez por processo.
+    """
+    config = serve.JitteredConfig(
+        serve.APP, limit_max_requests=MAX_REQUESTS, max_requests_jitter=JITTER
+    )
+    monkeypatch.setattr(serve.random, 'randint', lambda a, b: b)
+    first = config.limit_max_requests
+
+    monkeypatch.setattr(serve.random, 'randint', lambda a, b: a)
+    assert config.limit_max_requests == first == MAX_REQUESTS + JITTER
+
+    other_pid = os.getpid() + 1
+    monkeypatch.setattr(serve.os, 'getpid', lambda: other_pid)
+    assert config.limit_max_requests == MAX_REQUESTS
+
+
+def test_max_requests_disabled():
+    """
+    Testa que sem máximo de requisições o jitter não é aplicado.
+    """
+    config = serve.JitteredConfig(serve.APP, max_requests_jitter=JITTER)
+
+    assert config.limit_max_requests is None
+
+
+def test_dispose_engine_after_fork(monkeypatch):
+    """
+    Testa se o engine é descartado sem fechar as conexões do pai.
+    """
+    calls = []
+    engine = get_engine()
+    monkeypatch.setattr(
+        type(engine), 'dispose', lambda self, close: calls.append(close)
+    )
+
+    dispose_engine_after_fork()
+
+    assert calls == [False]
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from http import HTTPStatus
+
+import httpx
+import pytest
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from fastapi_do_zero.metrics import COALESCED_REQUESTS
+from fastapi_do_zero.responses import NegotiatedRoute
+from fastapi_do_zero.settings import get_settings
+from fastapi_do_zero.single_flight import coalesce, copy_response
+
+
+def make_app() -> tuple[FastAPI, list[int]]:
+    """
+    Cria uma aplicação com uma rota lenta agrupada e uma sem
+    agrupamento, que registram cada execução.
+    """
+    executions = []
+    router = APIRouter(prefix='/items', route_class=NegotiatedRoute)
+
+    @router.get('/{item_id}')
+    @coalesce
+    def read_item(item_id: int):
+        executions.append(item_id)
+        time.sleep(0.1)
+        if item_id == 0:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+        return {'id': item_id, 'execution': len(executions)}
+
+    @router.get('/{item_id}/raw')
+    def read_raw_item(item_id: int):
+        executions.append(item_id)
+        time.sleep(0.1)
+        return {'id': item_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app, executions
+
+
+def get_concurrently(app: FastAPI, requests: list[tuple[str, dict]]):
+    """
+    Faz as requisições ao mesmo tempo e retorna as respostas.
+    """
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://test'
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    client.get(url, headers=headers)
+                    for url, headers in requests
+                )
+            )
+
+    return asyncio.run(run())
+
+
+def test_coalesce_identical_reads():
+    """
+    Testa se leituras idênticas e simultâneas executam a rota uma vez
+    e recebem a mesma resposta.
+    """
+    app, executions = make_app()
+    before = COALESCED_REQUESTS.snapshot().get(('/items/{item_id}',), [0])[0]
+
+    responses = get_concurrently(app, [('/items/1', {})] * 5)
+
+    assert executions == [1]
+    assert {response.json()['execution'] for response in responses} == {1}
+    assert all(r.status_code == HTTPStatus.OK for r in responses)
+    assert (
+        COALESCED_REQUESTS.snapshot()[('/items/{item_id}',)][0] == before + 4
+    )
+
+
+def test_coalesce_keeps_principals_and_params_apart():
+    """
+    Testa se usuários, parâmetros e caminhos diferentes não
+    compartilham a execução.
+    """
+    app, executions = make_app()
+
+    get_concurrently(
+        app,
+        [
+            ('/items/1', {'Authorization': 'Bearer a'}),
+            ('/items/1', {'Authorization': 'Bearer b'}),
+            ('/items/1?extra=1', {'Authorization': 'Bearer a'}),
+            ('/items/2', {'Authorization': 'Bearer a'}),
+        ],
+    )
+
+    assert sorted(executions) == [1, 1, 1, 2]
+
+
+def test_coalesce_shares_errors():
+    """
+    Testa se um HTTPException da execução é repassado a todo o grupo.
+    """
+    app, executions = make_app()
+
+    responses = get_concurrently(app, [('/items/0', {})] * 3)
+
+    assert executions == [0]
+    assert all(r.status_code == HTTPStatus.NOT_FOUND for r in responses)
+
+
+def test_coalesce_runs_again_after_completion():
+    """
+    Testa se nada fica em cache depois que a execução termina.
+    """
+    app, executions = make_app()
+
+    get_concurrently(app, [('/items/1', {})])
+    get_concurrently(app, [('/items/1', {})])
+
+    assert executions == [1, 1]
+
+
+def test_routes_without_coalesce_run_every_request():
+    """
+    Testa se as rotas sem `coalesce` executam a cada requisição.
+    """
+    app, executions = make_app()
+
+    get_concurrently(app, [('/items/1/raw', {})] * 3)
+
+    assert executions == [1, 1, 1]
+
+
+def test_coalesce_disabled_runs_every_request(monkeypatch):
+    """
+    Testa se, com SINGLE_FLIGHT_ENABLED desabilitado, as rotas marcadas
+    com `coalesce` executam a cada requisição.
+    """
+    monkeypatch.setattr(get_settings(), 'SINGLE_FLIGHT_ENABLED', False)
+    app, executions = make_app()
+
+    get_concurrently(app, [('/items/1', {})] * 3)
+
+    assert executions == [1, 1, 1]
+
+
+def test_coalesced_routes_keep_responses(client, user):
+    """
+    Testa se as rotas agrupadas da aplicação continuam respondendo.
+    """
+    response = client.get(f'/users/{user.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['username'] == user.username
+    assert response.headers['vary'] == 'Accept, Accept-Encoding'
+
+
+@pytest.mark.parametrize(
+    'response',
+    [
+        StreamingResponse(iter([b'{}'])),
+        FileResponse(__file__),
+        Response(b'{}', background=BackgroundTasks()),
+    ],
+)
+def test_copy_response_rejects_single_use_responses(response):
+    """
+    Testa se respostas que não podem ser enviadas a várias requisições
+    são rejeitadas.
+    """
+    with pytest.raises(TypeError):
+        copy_response(response)
@@ -75,6 +75,69 @@ def test_list_todos_pagination_should_return_2_todos(
     assert response.json()['todos'][1]['updated_at'] is not None
 
 
+def test_list_todos_include_total_should_return_total(
+    session, user, client, token
+):
+    """
+    Testa a listagem de tarefas com o total de registros.
+
+    Verifica se o endpoint retorna o total de tarefas do usuário
+    junto com a página solicitada quando `include_total` é usado.
+    """
+    expected_todos = 2
+    expected_total = 5
+    session.bulk_save_objects(TodoFactory.create_batch(5, user_id=user.id))
+    session.commit()
+
+    response = client.get(
+        '/todos/?offset=1&limit=2&include_total=true',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['todos']) == expected_todos
+    assert response.json()['total'] == expected_total
+
+
+def test_list_todos_include_total_offset_past_end(
+    session, user, client, token
+):
+    """
+    Testa o total de registros quando a página solicitada está vazia.
+
+    Verifica se o total continua correto quando o offset ultrapassa
+    a quantidade de tarefas existentes.
+    """
+    expected_total = 5
+    session.bulk_save_objects(TodoFactory.create_batch(5, user_id=user.id))
+    session.commit()
+
+    response = client.get(
+        '/todos/?offset=10&include_total=true',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json() == {'todos': [], 'total': expected_total}
+
+
+def test_list_todos_include_total_limit_zero(session, user, client, token):
+    """
+    Testa o total de registros com limite zero e tarefas existentes.
+
+    Nenhuma linha é retornada, então o total vem da contagem separada,
+    mesmo sem deslocamento.
+    """
+    expected_total = 5
+    session.bulk_save_objects(TodoFactory.create_batch(5, user_id=user.id))
+    session.commit()
+
+    response = client.get(
+        '/todos/?limit=0&include_total=true',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json() == {'todos': [], 'total': expected_total}
+
+
 def test_list_todos_filter_tile_should_return_5_todos(
     session, user, client, token
 ):
@@ -1,5 +1,22 @@
+import sqlite3
+import sys
 from datetime import UTC, datetime
 from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import dialects, func, select
+from sqlalchemy.exc import IntegrityError
+
+from fastapi_do_zero.models import Todo, User
+from fastapi_do_zero.routers import users
+from fastapi_do_zero.routers.users import (
+    MAX_PAGE_SIZE,
+    prefix_upper_bound,
+    unique_violation_detail,
+    username_prefix_filters,
+)
+from tests.conftest import TodoFactory, UserFactory
 
 
 def test_create_user(client):
@@ -84,6 +101,7 @@ def test_create_user_username_exist(client, user):
     )
 
     assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Usuário já existente'}
 
 
 # Exercício Aula 5 - Escrever um teste para o endpoint de POST (
@@ -127,6 +145,7 @@ def test_create_user_email_exist(client, user):
     )
 
     assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'E-mail já existente'}
 
 
 def test_read_users(client):
@@ -181,6 +200,243 @@ def test_read_users_with_user(client, user):
     assert response.status_code == HTTPStatus.OK
 
 
+def test_read_users_include_total(client, user, other_user):
+    """
+    Teste para o endpoint de leitura de usuários com o total de
+    registros.
+
+    Verifica se o total de usuários cadastrados é retornado junto
+    com a página quando `include_total` é usado.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): Um usuário já existente no banco de dados.
+        other_user (User): Um segundo usuário no banco de dados.
+
+    Raises:
+        AssertionError: Se a página ou o total não corresponderem
+        ao esperado.
+    """
+    expected_total = 2
+    response = client.get('/users/?limit=1&include_total=true')
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['users']) == 1
+    assert response.json()['total'] == expected_total
+
+
+def test_read_users_cursor_pagination(client, user, other_user):
+    """
+    Teste para a paginação por cursor no endpoint de leitura de
+    usuários.
+
+    Verifica se a primeira página retorna o `next_cursor` e se a
+    página seguinte, obtida com `after`, contém o próximo usuário.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): Um usuário já existente no banco de dados.
+        other_user (User): Um segundo usuário no banco de dados.
+
+    Raises:
+        AssertionError: Se as páginas não corresponderem ao esperado.
+    """
+    first_page = client.get('/users/?limit=1').json()
+
+    assert first_page['users'][0]['id'] == user.id
+    assert first_page['next_cursor'] == user.id
+
+    second_page = client.get(
+        f'/users/?limit=1&after={first_page["next_cursor"]}'
+    ).json()
+
+    assert second_page['users'][0]['id'] == other_user.id
+
+
+def test_read_users_username_prefix(client, session):
+    """
+    Teste para a busca por prefixo do nome de usuário.
+
+    Verifica se apenas os usuários cujo nome começa com o prefixo
+    informado são retornados.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        session (Session): Sessão de banco de dados para os testes.
+
+    Raises:
+        AssertionError: Se os usuários retornados não corresponderem
+        ao prefixo.
+    """
+    session.add_all([
+        UserFactory(username='maria'),
+        UserFactory(username='mariana'),
+        UserFactory(username='mario_'),
+        UserFactory(username='joao'),
+    ])
+    session.commit()
+
+    response = client.get('/users/?username=maria')
+
+    assert [u['username'] for u in response.json()['users']] == [
+        'maria',
+        'mariana',
+    ]
+
+
+def test_read_users_username_prefix_last_code_point(client, session):
+    """
+    Teste para a busca por um prefixo terminado no último caractere
+    Unicode (U+10FFFF), que não tem sucessor.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        session (Session): Sessão de banco de dados para os testes.
+
+    Raises:
+        AssertionError: Se a busca falhar ou não encontrar o usuário.
+    """
+    username = f'ana{chr(sys.maxunicode)}'
+    session.add(UserFactory(username=username, email='ana@test.com'))
+    session.commit()
+
+    response = client.get('/users/', params={'username': username})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [u['username'] for u in response.json()['users']] == [username]
+
+
+@pytest.mark.parametrize(
+    ('orig', 'expected'),
+    [
+        (
+            sqlite3.IntegrityError('UNIQUE constraint failed: users.email'),
+            'E-mail já existente',
+        ),
+        (
+            sqlite3.IntegrityError('UNIQUE constraint failed: users.username'),
+            'Usuário já existente',
+        ),
+        (
+            sqlite3.IntegrityError(
+                'NOT NULL constraint failed: users.username'
+            ),
+            None,
+        ),
+        (sqlite3.IntegrityError('FOREIGN KEY constraint failed'), None),
+    ],
+)
+def test_unique_violation_detail_sqlite(orig, expected):
+    """
+    Teste da tradução dos erros de integridade do SQLite: apenas as
+    violações de unicidade de username e e-mail viram mensagens.
+    """
+    error = IntegrityError('INSERT', {}, orig)
+
+    assert unique_violation_detail(error) == expected
+
+
+@pytest.mark.parametrize(
+    ('sqlstate', 'constraint', 'expected'),
+    [
+        ('23505', 'users_email_key', 'E-mail já existente'),
+        ('23505', 'users_username_key', 'Usuário já existente'),
+        ('23505', 'users_pkey', None),
+        ('23503', 'todos_user_id_fkey', None),
+        ('23502', None, None),
+    ],
+)
+def test_unique_violation_detail_postgres(sqlstate, constraint, expected):
+    """
+    Teste da tradução dos erros de integridade do PostgreSQL, a partir
+    do diagnóstico do driver.
+    """
+
+    class DriverError(Exception):
+        diag = SimpleNamespace(sqlstate=sqlstate, constraint_name=constraint)
+
+    error = IntegrityError('INSERT', {}, DriverError())
+
+    assert unique_violation_detail(error) == expected
+
+
+def test_update_user_columns_other_integrity_error(session, user, monkeypatch):
+    """
+    Teste para um erro de integridade que não é de unicidade: o erro
+    é repassado em vez de virar 'Usuário já existente'.
+    """
+
+    def failing_execute(*args, **kwargs):
+        raise IntegrityError(
+            'UPDATE',
+            {},
+            sqlite3.IntegrityError('NOT NULL constraint failed: users.email'),
+        )
+
+    monkeypatch.setattr(session, 'execute', failing_execute)
+
+    with pytest.raises(IntegrityError):
+        users.update_user_columns(session, user.id, {'email': None})
+
+
+def test_prefix_upper_bound():
+    """
+    Teste do limite superior da busca por prefixo, inclusive para os
+    caracteres sem sucessor e antes dos substitutos UTF-16.
+    """
+    assert prefix_upper_bound('maria') == 'marib'
+    assert prefix_upper_bound(f'ab{chr(sys.maxunicode)}') == 'ac'
+    assert prefix_upper_bound(chr(sys.maxunicode)) is None
+    assert prefix_upper_bound('a\ud7ff') == 'a\ue000'
+
+
+@pytest.mark.parametrize(
+    ('dialect', 'collated', 'ranged'),
+    [
+        ('postgresql', True, True),
+        ('sqlite', False, True),
+        ('mysql', False, False),
+    ],
+)
+def test_username_prefix_filters(dialect, collated, ranged):
+    """
+    Teste dos filtros da busca por prefixo: o intervalo usa a collation
+    "C" no PostgreSQL, a padrão no SQLite e não é aplicado nos demais.
+    """
+    sql = str(
+        select(User.id)
+        .where(*username_prefix_filters('mari_a', dialect))
+        .compile(dialect=dialects.registry.load(dialect)())
+    )
+
+    assert ('COLLATE "C"' in sql) is collated
+    assert ('>=' in sql) is ranged
+    assert 'LIKE' in sql
+
+
+def test_read_users_limit_above_max(client):
+    """
+    Teste para o limite máximo de usuários por página.
+
+    Verifica se um `limit` acima de MAX_PAGE_SIZE é rejeitado com
+    status HTTP 422.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+
+    Raises:
+        AssertionError: Se o status da resposta não for 422.
+    """
+    response = client.get(f'/users/?limit={MAX_PAGE_SIZE + 1}')
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 # Exercício aula 5 - Implementar o banco de dados para o endpoint
 # de listagem por id, criado no exercício 3 da aula 03.
 def test_read_user(client, user):
@@ -204,6 +460,41 @@ def test_read_user(client, user):
     assert response.status_code == HTTPStatus.OK
 
 
+def test_read_users_public_fields(
+    client, user, other_user, assert_num_queries
+):
+    """
+    Testa se a listagem e a leitura de um usuário retornam exatamente
+    os campos públicos, nunca a senha, e se a listagem com o total
+    continua em uma única consulta.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): Um usuário já existente no banco de dados.
+        other_user (User): Um segundo usuário no banco de dados.
+        assert_num_queries (Callable): Verifica a quantidade de
+        consultas executadas.
+
+    Raises:
+        AssertionError: Se algum campo diferente dos públicos for
+        retornado ou se a listagem executar mais de uma consulta.
+    """
+    public_fields = {'id', 'username', 'email', 'created_at', 'updated_at'}
+    expected_total = 2
+
+    with assert_num_queries(1):
+        response = client.get('/users/?include_total=true')
+    detail = client.get(f'/users/{user.id}')
+
+    assert response.json()['total'] == expected_total
+    assert [set(item) for item in response.json()['users']] == [
+        public_fields,
+        public_fields,
+    ]
+    assert set(detail.json()) == public_fields
+
+
 def test_read_user_not_found(client):
     """
     Teste para o endpoint de leitura de um usuário inexistente.
@@ -368,3 +659,312 @@ def test_delete_wrong_user(client, other_user, token):
         headers={'Authorization': f'Bearer {token}'},
     )
     assert response.json() == {'detail': 'Not enough permission'}
+
+
+def test_create_users_bulk(session, client, user, token):
+    """
+    Teste para o endpoint de criação de usuários em lote.
+
+    Verifica se os usuários válidos são criados e se os conflitos com
+    o banco e dentro do próprio lote são reportados por item.
+
+    Args:
+        session (Session): A sessão de banco de dados, usada para
+        tornar o usuário administrador.
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): O usuário administrador autenticado.
+        token (str): O token de acesso JWT para autenticação.
+
+    Raises:
+        AssertionError: Se os resultados não corresponderem ao
+        esperado.
+    """
+    user.is_admin = True
+    session.commit()
+
+    response = client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'username': 'ana', 'email': 'ana@test.com', 'password': '1'},
+            {'username': user.username, 'email': 'x@t.com', 'password': '1'},
+            {'username': 'bia', 'email': 'ana@test.com', 'password': '1'},
+            {'username': 'caio', 'email': 'caio@test.com', 'password': '1'},
+        ],
+    )
+
+    results = response.json()['results']
+    assert response.status_code == HTTPStatus.OK
+    assert [r['status'] for r in results] == [
+        HTTPStatus.CREATED,
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.CREATED,
+    ]
+    assert results[0]['user']['username'] == 'ana'
+    assert results[1]['detail'] == 'Usuário já existente'
+    assert results[2]['detail'] == 'E-mail já existente'
+    assert results[3]['user']['username'] == 'caio'
+
+
+def test_create_users_bulk_not_admin(client, token):
+    """
+    Teste para o endpoint de criação de usuários em lote sem
+    permissão de administrador.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        token (str): O token de acesso JWT para autenticação.
+
+    Raises:
+        AssertionError: Se o status da resposta não for 403.
+    """
+    response = client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[],
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_create_users_bulk_concurrent_conflict(
+    session, client, user, token, monkeypatch
+):
+    """
+    Teste para a criação em lote com um usuário criado concorrentemente.
+
+    Enquanto as senhas são criptografadas, sem transação aberta, outra
+    requisição cria um usuário com o nome de um item do lote. Apenas
+    esse item falha; os demais são criados.
+
+    Args:
+        session (Session): A sessão de banco de dados, compartilhada
+        com a rota.
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): O usuário administrador autenticado.
+        token (str): O token de acesso JWT para autenticação.
+        monkeypatch (MonkeyPatch): Utilizado para criar o usuário
+        concorrente durante o cálculo dos hashes.
+
+    Raises:
+        AssertionError: Se a transação continuar aberta durante os
+        hashes ou se o lote inteiro falhar.
+    """
+    user.is_admin = True
+    session.commit()
+    in_transaction = []
+
+    def hashes_with_concurrent_user(passwords):
+        in_transaction.append(session.in_transaction())
+        if len(in_transaction) == 1:
+            session.add(
+                User(username='ana', email='outra@test.com', password='x')
+            )
+            session.commit()
+        return [f'hash-{password}' for password in passwords]
+
+    monkeypatch.setattr(
+        users, 'get_password_hashes', hashes_with_concurrent_user
+    )
+
+    response = client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'username': 'ana', 'email': 'ana@test.com', 'password': '1'},
+            {'username': 'caio', 'email': 'caio@test.com', 'password': '1'},
+        ],
+    )
+
+    results = response.json()['results']
+    assert response.status_code == HTTPStatus.OK
+    assert not any(in_transaction)
+    assert [r['status'] for r in results] == [
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.CREATED,
+    ]
+    assert results[0]['detail'] == 'Usuário já existente'
+    assert results[1]['user']['username'] == 'caio'
+
+
+def test_rename_into_admin_username_not_admin(
+    session, client, user, other_user, token
+):
+    """
+    Teste para a troca do nome de usuário para o de um administrador.
+
+    O administrador troca de nome e outro usuário passa a usar o nome
+    antigo, que fica livre. O acesso administrativo pertence à conta,
+    não ao nome, então o novo token continua sem permissão.
+
+    Args:
+        session (Session): A sessão de banco de dados, usada para
+        tornar o outro usuário administrador.
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): O usuário que troca de nome.
+        other_user (User): O administrador.
+        token (str): O token de acesso JWT do usuário.
+
+    Raises:
+        AssertionError: Se o usuário renomeado obtiver acesso.
+    """
+    admin_username = other_user.username
+    other_user.is_admin = True
+    other_user.username = f'{admin_username}-old'
+    session.commit()
+
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': admin_username},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        'auth/token',
+        data={'username': admin_username, 'password': user.clean_password},
+    )
+    new_token = response.json()['access_token']
+
+    response = client.post(
+        '/users/bulk',
+        headers={'Authorization': f'Bearer {new_token}'},
+        json=[],
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_delete_user_cascades_todos(session, client, user, token):
+    """
+    Teste para a exclusão de um usuário que possui tarefas.
+
+    Verifica se as tarefas do usuário são removidas pelo banco de
+    dados (ON DELETE CASCADE) junto com o usuário.
+
+    Args:
+        session (Session): Sessão de banco de dados para os testes.
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): Um usuário já existente no banco de dados.
+        token (str): O token de acesso JWT para autenticação.
+
+    Raises:
+        AssertionError: Se alguma tarefa do usuário permanecer.
+    """
+    session.bulk_save_objects(TodoFactory.create_batch(3, user_id=user.id))
+    session.commit()
+
+    response = client.delete(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert session.scalar(select(func.count()).select_from(Todo)) == 0
+
+
+def test_update_user_same_password_skips_rehash(
+    client, user, token, monkeypatch
+):
+    """
+    Teste para a atualização de usuário com a senha inalterada.
+
+    Verifica se nenhum novo hash é gerado quando a senha enviada é
+    igual à atual ou quando ela é omitida.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): Um usuário já existente no banco de dados.
+        token (str): O token de acesso JWT para autenticação.
+        monkeypatch (MonkeyPatch): Utilizado para detectar chamadas
+        ao gerador de hash.
+
+    Raises:
+        AssertionError: Se um novo hash for gerado.
+    """
+    calls = []
+    monkeypatch.setattr(users, 'get_password_hash', calls.append)
+
+    for payload in (
+        {'username': user.username, 'email': 'samael@gmail.com'},
+        {
+            'username': user.username,
+            'email': 'samael@gmail.com',
+            'password': user.clean_password,
+        },
+    ):
+        response = client.put(
+            f'/users/{user.id}',
+            headers={'Authorization': f'Bearer {token}'},
+            json=payload,
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    assert calls == []
+
+
+def test_patch_user(client, user, token):
+    """
+    Teste para o endpoint de atualização parcial de usuário.
+
+    Verifica se apenas o e-mail é alterado e se a senha continua
+    válida para o login.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): Um usuário já existente no banco de dados.
+        token (str): O token de acesso JWT para autenticação.
+
+    Raises:
+        AssertionError: Se os dados retornados não corresponderem ao
+        esperado.
+    """
+    username = user.username
+
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'email': 'novo@test.com'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['username'] == username
+    assert response.json()['email'] == 'novo@test.com'
+
+    login = client.post(
+        '/auth/token',
+        data={'username': username, 'password': user.clean_password},
+    )
+    assert login.status_code == HTTPStatus.OK
+
+
+def test_patch_user_email_exist(client, user, other_user, token):
+    """
+    Teste para a atualização parcial com um e-mail já existente.
+
+    Args:
+        client (TestClient): O cliente de teste para fazer a
+        requisição.
+        user (User): O usuário autenticado.
+        other_user (User): Outro usuário já existente no banco.
+        token (str): O token de acesso JWT para autenticação.
+
+    Raises:
+        AssertionError: Se o status da resposta não for 400.
+    """
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'email': other_user.email},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'E-mail já existente'}
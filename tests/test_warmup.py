@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import fastapi_do_zero.app
+from fastapi_do_zero.app import app
+from fastapi_do_zero.settings import get_settings
+from fastapi_do_zero.warmup import warm_up
+
+
+def test_warm_up(session, caplog):
+    """
+    Testa o aquecimento em um banco com as tabelas criadas.
+    """
+    with caplog.at_level(logging.INFO, 'fastapi_do_zero.warmup'):
+        elapsed = warm_up(session.get_bind(), connections=2)
+
+    assert elapsed > 0
+    assert 'Warm-up finished' in caplog.text
+    assert 'failed' not in caplog.text
+
+
+@pytest.fixture()
+def lifespan_engine(monkeypatch):
+    """
+    Fixture que troca o engine usado pelo aquecimento da inicialização,
+    para que os testes não dependam do banco de `DATABASE_URL`.
+
+    Returns:
+        Callable: Função que recebe o engine a ser usado.
+    """
+    monkeypatch.setattr(get_settings(), 'WARMUP_ENABLED', True)
+
+    def use(engine):
+        monkeypatch.setattr(fastapi_do_zero.app, 'get_engine', lambda: engine)
+
+    return use
+
+
+def test_lifespan_marks_app_ready(session, lifespan_engine, caplog):
+    """
+    Testa se a aplicação fica pronta após aquecer um banco com as
+    tabelas criadas.
+    """
+    lifespan_engine(session.get_bind())
+
+    with (
+        caplog.at_level(logging.INFO, 'fastapi_do_zero.warmup'),
+        TestClient(app),
+    ):
+        assert app.state.ready
+
+    assert 'Warm-up finished' in caplog.text
+    assert 'failed' not in caplog.text
+
+
+def test_lifespan_marks_app_ready_when_database_fails(
+    lifespan_engine, tmp_path, caplog
+):
+    """
+    Testa se a aplicação fica pronta mesmo quando o aquecimento do
+    banco falha, com um engine que não consegue abrir conexões.
+    """
+    lifespan_engine(create_engine(f'sqlite:///{tmp_path}/missing/app.db'))
+
+    with (
+        caplog.at_level(logging.INFO, 'fastapi_do_zero.warmup'),
+        TestClient(app),
+    ):
+        assert app.state.ready
+
+    assert 'Database warm-up failed' in caplog.text
+    assert 'Warm-up finished' in caplog.text